@@ -1,10 +1,13 @@
 # auth_api.py - Clean downgraded bcrypt version (no passlib)
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
 from pydantic import BaseModel
-from jose import jwt
+from typing import Optional
 from datetime import datetime, timedelta
 import logging
-import bcrypt  # low-level only
+import os
+from utils.password_util import password_verifier
+from utils.rate_limit_util import login_ip_limiter, login_account_limiter
+from utils.jwt_auth_util import bearer_token, create_access_token, revoke_token
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,33 +22,54 @@ users_db = {
     }
 }
 
-# JWT config
-SECRET_KEY = "giyo-secret-key"
-ALGORITHM = "HS256"
+# JWT config (secret and algorithm live in utils/jwt_auth_util; JWT_SECRET_KEY env)
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
 
+# Only honour X-Forwarded-For behind a trusted proxy
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+# Proxies append to X-Forwarded-For, so the client address is this many entries from the right
+TRUSTED_PROXY_HOPS = max(1, int(os.getenv("TRUSTED_PROXY_HOPS", "1")))
+
 router = APIRouter(tags=["Authentication"])
 
+def client_ip(http_request: Request):
+    if TRUST_FORWARDED_FOR and http_request.headers.get("x-forwarded-for"):
+        # Leftmost entries are whatever the client sent; only the ones our proxies added count
+        hops = [entry.strip() for entry in http_request.headers["x-forwarded-for"].split(",") if entry.strip()]
+        if hops:
+            return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return http_request.client.host if http_request.client else "unknown"
+
+def throttle_login(ip: str, email: str):
+    # Checked before any bcrypt work so a login storm is turned away cheaply
+    for limiter, key in ((login_ip_limiter, ip), (login_account_limiter, email.strip().lower())):
+        retry_after = limiter.take(key)
+        if retry_after:
+            logger.warning(f"Login throttled ({limiter.name}) for {key}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(int(retry_after) + 1)}
+            )
+
 class LoginRequest(BaseModel):
     email: str
     password: str
 
 @router.post("/api/auth/login")
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, http_request: Request):
     try:
         logger.info(f"Login attempt for: {request.email}")
-        logger.info(f"Provided password length: {len(request.password)} chars")
+        throttle_login(client_ip(http_request), request.email)
 
         user = users_db.get(request.email)
         if not user:
             logger.error("User not found in database")
+            await password_verifier.verify_unknown_account(request.password)
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
-        logger.info(f"Stored hash: {user['password']}")
-        logger.info("Hash verification starting...")
-
-        # Final: bcrypt.checkpw with encoded values only
-        if not bcrypt.checkpw(request.password.encode(), user["password"].encode()):
+        # bcrypt runs in the bounded verifier pool, never on the event loop
+        if not await password_verifier.verify(request.password, user["password"]):
             logger.error("Password verification failed")
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -55,11 +79,24 @@ async def login(request: LoginRequest):
             "branch_id": user["branch_id"],
             "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         }
-        token = jwt.encode(token_data, SECRET_KEY, algorithm=ALGORITHM)
+        token = create_access_token(token_data)
 
         logger.info("Login successful")
         return {"access_token": token, "token_type": "bearer"}
 
+    except HTTPException:
+        # 401/429/503 go out as they are
+        raise
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/api/auth/logout")
+async def logout(authorization: Optional[str] = Header(default=None)):
+    """Revoke the bearer token until it expires"""
+    token = bearer_token(authorization)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    claims = revoke_token(token)
+    logger.info(f"Logout for: {claims.get('sub')}")
+    return {"success": True}
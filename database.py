@@ -1,21 +1,81 @@
 import os
-from sqlalchemy import create_engine
+import logging
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
-# from database import SessionLocal
 from dotenv import load_dotenv
+from utils.db_pool_util import PoolStats, ReplicaHealth, REPLICA_LAG_SQL, pool_settings_from_env
+from utils.read_after_write_util import prefer_primary
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
 
-def get_db():
+
+async def get_db():
+    # Async session per request; handlers await every DB call so the event loop stays free.
+    # The pooled connection is taken on first use, not while the request body is still parsed
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def read_session():
+    # Read-only session for public GETs: replica when configured and healthy, primary otherwise.
+    # Shortly after a write the primary is used, so caches rebuilt then never hold pre-write rows
+    if ReadSessionLocal is not None and replica_health.available() and not prefer_primary():
+        async with ReadSessionLocal() as db:
+            if replica_health.needs_check():
+                try:
+                    replica_health.record_lag(await db.scalar(text(REPLICA_LAG_SQL)))
+                except Exception as e:
+                    logger.warning(f"Replica unavailable, reading from primary: {str(e)}")
+                    replica_health.record_failure(e)
+                else:
+                    if not replica_health.healthy:
+                        logger.warning(f"Replica lag {replica_health.last_lag_seconds}s over limit, reading from primary")
+            if replica_health.healthy:
+                try:
+                    yield db
+                except DBAPIError as e:
+                    # Connection lost mid-request: later reads go to the primary until the next check
+                    if e.connection_invalidated:
+                        replica_health.record_failure(e)
+                    raise
+                return
+
+    if ReadSessionLocal is not None and not replica_health.healthy:
+        replica_health.record_fallback()
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_sync_db():
+    # For legacy sync routers and scripts
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+def to_async_url(url: str) -> str:
+    """Point a plain postgres URL at the asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+def create_pooled_engine(url: str, name: str = "primary", env_prefix: str = "DB"):
+    """Async engine with pool settings from the environment and a PoolStats collector attached"""
+    profile, settings = pool_settings_from_env(env_prefix)
+    async_engine = create_async_engine(to_async_url(url), **settings)
+    stats = PoolStats(name, profile)
+    stats.attach(async_engine.sync_engine)
+    return async_engine, stats
+
 # Database URL from environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -23,12 +83,27 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set.")
 
 # SQLAlchemy setup
-engine = create_engine(DATABASE_URL)
+# Sync engine is kept for setup_db.py and one-off scripts; the API uses the async engine
+engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine, pool_stats = create_pooled_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Optional read replica for catalog GETs; writes always stay on the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+replica_health = ReplicaHealth(
+    max_lag_seconds=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5")),
+    check_interval=float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+)
+if DATABASE_REPLICA_URL:
+    replica_engine, replica_pool_stats = create_pooled_engine(DATABASE_REPLICA_URL, name="replica", env_prefix="DB_REPLICA")
+    ReadSessionLocal = async_sessionmaker(replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+else:
+    replica_engine = replica_pool_stats = ReadSessionLocal = None
 Base = declarative_base()
 
 # Import models to ensure they are registered before table creation
-from models import db_service, db_brochure
+from models import db_service, db_brochure, db_marketing_item, db_logs, db_code_counter
 
 # Initialize Database
 def init_db():
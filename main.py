@@ -3,12 +3,18 @@
 
 import logging
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from database import engine, async_engine, replica_engine, Base
 from routers import services, brochure_api_v2 as brochure_api, info
-from routers import marketing_items
+from routers import marketing_items, internal, search
 from auth_api import router as auth_router
+from utils.logging_db_util import audit_log_queue
+from utils.upload_util import MaxUploadSizeMiddleware, MAX_IMAGE_BYTES
+from utils.static_files_util import CachedStaticFiles
+from utils.bulk_import_util import MAX_IMPORT_BYTES
+from utils.image_derivatives_util import shutdown_pool as shutdown_image_pool
+from utils.password_util import password_verifier
 
 # Configure logging FIRST
 logging.basicConfig(
@@ -22,10 +28,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info("Initializing FastAPI application")
 
-app = FastAPI()
+# orjson for every JSON response (handlers returning dicts/lists)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 logger.info("Static files mounted at /static")
 
 @app.get("/health")
@@ -33,6 +40,19 @@ def health_check():
     logger.debug("Health check endpoint accessed")
     return {"status": "ok"}
 
+# Refuse oversized uploads before their body is read (CORS below still wraps the 413)
+app.add_middleware(
+    MaxUploadSizeMiddleware,
+    path_prefixes=["/api/v1/brochures"],
+    exclude_prefixes=["/api/v1/brochures/import"],
+    max_bytes=MAX_IMAGE_BYTES + 1024 * 1024  # image plus form fields
+)
+app.add_middleware(
+    MaxUploadSizeMiddleware,
+    path_prefixes=["/api/v1/services/import", "/api/v1/brochures/import"],
+    max_bytes=MAX_IMPORT_BYTES + 1024 * 1024
+)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -52,8 +72,26 @@ app.include_router(services.router, prefix="/api/v1/services", tags=["Services"]
 app.include_router(brochure_api.router, prefix="/api/v1/brochures", tags=["Brochures"])
 app.include_router(info.router, prefix="/api/v1", tags=["Info"])
 app.include_router(marketing_items.router, prefix="/api/v1/marketing-items", tags=["Marketing Items"])
+app.include_router(internal.router, prefix="/api/v1/internal", tags=["Internal"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["Search"])
 logger.info("All routers mounted")
 
+@app.on_event("startup")
+async def start_audit_log_writer():
+    audit_log_queue.start()
+    logger.info("Audit log writer started")
+
+@app.on_event("shutdown")
+async def close_database():
+    # Flush queued audit entries, then return pooled asyncpg connections cleanly
+    await audit_log_queue.stop()
+    shutdown_image_pool()
+    password_verifier.shutdown()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    logger.info("Async database engine disposed")
+
 @app.get("/")
 def read_root():
     logger.debug("Root endpoint accessed")
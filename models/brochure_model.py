@@ -1,7 +1,8 @@
 
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import AliasChoices, BaseModel, Field, field_validator, model_validator
+from typing import Literal, Optional, List
 from datetime import date
+from uuid import UUID
 
 class BrochureBase(BaseModel):
     tags: Optional[List[str]] = []
@@ -18,6 +19,80 @@ class BrochureBase(BaseModel):
 class BrochureCreate(BrochureBase):
     pass
 
+class BrochureImport(BaseModel):
+    """One row of a bulk import; same rules as the create form (branch comes from x-admin-branch)"""
+    title: str
+    description: str
+    category: str
+    price: float
+    cta_phone: str
+    code: Optional[str] = None
+    slug: Optional[str] = None
+    start_date: Optional[date] = None
+    expiry_date: Optional[date] = Field(None, validation_alias=AliasChoices("expiry_date", "end_date"))
+    infinite: bool = False
+    cta_override: Optional[str] = None
+    status: Literal["active", "archived"] = "active"
+    image_url: Optional[str] = None
+    tags: Optional[List[str]] = []
+
+    @field_validator("title", "category")
+    @classmethod
+    def not_blank(cls, value):
+        if not value.strip():
+            raise ValueError("cannot be blank")
+        return value.strip()
+
+    @field_validator("price")
+    @classmethod
+    def price_positive(cls, value):
+        if value <= 0:
+            raise ValueError("Price must be positive")
+        return value
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def split_tags(cls, value):
+        if isinstance(value, str):
+            return [tag.strip() for tag in value.split(",") if tag.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def dates_in_order(self):
+        if self.start_date and self.expiry_date and self.start_date > self.expiry_date:
+            raise ValueError("Start date cannot be after end date")
+        return self
+
+class BrochureBulkFilter(BaseModel):
+    branch_id: Optional[UUID] = None
+    category: Optional[str] = None
+    tag: Optional[str] = None
+    date_from: Optional[date] = None  # on start_date (creation date when unset)
+    date_to: Optional[date] = None
+
+class BrochurePatch(BaseModel):
+    """Fields a bulk update may set; code, slug and CTA phone stay per-item"""
+    description: Optional[str] = None
+    category: Optional[str] = None
+    price: Optional[float] = None
+    start_date: Optional[date] = None
+    expiry_date: Optional[date] = None
+    infinite: Optional[bool] = None
+    cta_override: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+    @model_validator(mode="after")
+    def dates_in_order(self):
+        if self.start_date and self.expiry_date and self.start_date > self.expiry_date:
+            raise ValueError("Start date cannot be after end date")
+        return self
+
+class BrochureBulkAction(BaseModel):
+    action: Literal["update", "archive", "restore"]
+    ids: Optional[List[int]] = None
+    filter: Optional[BrochureBulkFilter] = None
+    patch: Optional[BrochurePatch] = None
+
 class BrochureUpdate(BaseModel):
     title: Optional[str]
     description: Optional[str]
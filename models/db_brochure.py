@@ -1,9 +1,29 @@
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy import Column, Integer, String, Boolean, Date, Numeric, Text
+from datetime import date, datetime
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy import Column, Computed, Integer, String, Boolean, Date, DateTime, Numeric, Text, Index, and_, or_, case, cast, func
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred
 from database import Base
+from utils.search_util import search_vector_sql
+from utils.pagination_util import title_sort_key
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
+BROCHURE_STATUSES = ("active", "coming_soon", "expired", "archived")
+
+def compute_brochure_status(status, start_date, expiry_date, infinite, today=None):
+    """Python mirror of Brochure.lifecycle_status for rows already in memory"""
+    today = today or date.today()
+    if status == "archived":
+        return "archived"
+    if infinite:
+        return "active"
+    if start_date and start_date > today:
+        return "coming_soon"
+    if expiry_date and expiry_date < today:
+        return "expired"
+    return "active"
+
 class Brochure(Base):
     __tablename__ = "brochures"
 
@@ -15,6 +35,9 @@ class Brochure(Base):
     code = Column(String, unique=True)
     slug = Column(String, unique=True)
     image_url = Column(String)
+    image_hash = Column(String(64), nullable=True, index=True)  # sha256 of the stored original; shared by duplicates
+    image_variants = Column(JSONB, nullable=True)  # {"thumb"|"card"|"full": {width, height, jpg, webp}} as URLs
+    image_placeholder = Column(Text, nullable=True)  # tiny blurred WebP data URI
     start_date = Column(Date, nullable=True)
     price = Column(Numeric, nullable=True)  # 🔁 moved higher
     expiry_date = Column(Date, nullable=True)
@@ -22,10 +45,107 @@ class Brochure(Base):
     tags = Column(ARRAY(Text), default=[])
     cta_override = Column(String, nullable=True)
     cta_phone = Column(String)
-    status = Column(String, default="active")
+    status = Column(String, default="active")  # admin-set; "archived" is the archive flag
     cta_link = Column(String)
+    is_deleted = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Maintained by Postgres; deferred so normal loads never fetch it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        search_vector_sql(("title", "A"), ("description", "B"), ("category", "C")), persisted=True
+    )))
 
+    __table_args__ = (
+        # Serves ?status=...&branch_id=... as a single range scan
+        Index("ix_brochures_branch_status_dates", "branch_id", "status", "start_date", "expiry_date"),
+        # Live marketing feed ordered by title (routers/marketing_items.py)
+        Index("ix_brochures_branch_title_c_id", "branch_id", title_sort_key(title), "id"),
+        # Slug family lookups in utils/auto_generate_util.allocate_unique_slugs
+        Index("ix_brochures_slug_family", func.regexp_replace(slug, r"-\d+$", "")),
+        # Full-text search (routers/search.py)
+        Index("ix_brochures_search_vector", "search_vector", postgresql_using="gin"),
+        # ?tags= filters (&&, @>) and tag facets
+        Index("ix_brochures_tags", "tags", postgresql_using="gin"),
+    )
 
+    # Effective status (active / coming_soon / expired / archived) derived from the dates
+    @hybrid_property
+    def lifecycle_status(self):
+        return compute_brochure_status(self.status, self.start_date, self.expiry_date, self.infinite)
 
-# Touch commit for redeploy
+    @lifecycle_status.expression
+    def lifecycle_status(cls):
+        today = func.current_date()
+        return case(
+            (cls.status == "archived", "archived"),
+            (cls.infinite.is_(True), "active"),
+            (cls.start_date > today, "coming_soon"),
+            (cls.expiry_date < today, "expired"),
+            else_="active"
+        )
+
+    # Feed ordering position: start_date, or the creation date when there is none
+    @hybrid_property
+    def effective_start(self):
+        if self.start_date:
+            return self.start_date
+        return self.created_at.date() if self.created_at else None
+
+    @effective_start.expression
+    def effective_start(cls):
+        return func.coalesce(cls.start_date, cast(cls.created_at, Date))
 
+    @classmethod
+    def status_filter(cls, status):
+        """
+        Index-friendly WHERE clause equivalent to lifecycle_status == status.
+        Raises ValueError for unknown statuses.
+        """
+        today = func.current_date()
+        not_archived = cls.status.is_distinct_from("archived")
+        started = or_(cls.start_date.is_(None), cls.start_date <= today)
+        if status == "archived":
+            return cls.status == "archived"
+        if status == "active":
+            return and_(not_archived, or_(
+                cls.infinite.is_(True),
+                and_(started, or_(cls.expiry_date.is_(None), cls.expiry_date >= today))
+            ))
+        if status == "coming_soon":
+            return and_(not_archived, cls.infinite.isnot(True), cls.start_date > today)
+        if status == "expired":
+            return and_(not_archived, cls.infinite.isnot(True), started, cls.expiry_date < today)
+        raise ValueError(f"status must be one of {list(BROCHURE_STATUSES)}")
+
+    def to_dict(self, status=None):
+        return {
+            "id": self.id,
+            "branch_id": self.branch_id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "code": self.code,
+            "slug": self.slug,
+            "image_url": self.image_url,
+            "image_hash": self.image_hash,
+            "image_variants": self.image_variants,
+            "image_placeholder": self.image_placeholder,
+            "start_date": self.start_date,
+            "expiry_date": self.expiry_date,
+            "infinite": self.infinite,
+            "price": self.price,
+            "tags": self.tags or [],
+            "cta_link": self.cta_link,
+            "status": status or self.lifecycle_status,
+            "created_at": self.created_at
+        }
+
+# Expression index backing the date-ordered marketing feed merge
+Index(
+    "ix_brochures_branch_effective_start_id",
+    Brochure.branch_id,
+    func.coalesce(Brochure.start_date, cast(Brochure.created_at, Date)),
+    Brochure.id
+)
+
+
+# Touch commit for redeploy
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+class CodeCounter(Base):
+    """Last number handed out per code prefix (e.g. "0525-SER")"""
+    __tablename__ = "code_counters"
+
+    prefix = Column(String(32), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
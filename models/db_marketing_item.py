@@ -0,0 +1,62 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Index, UniqueConstraint, case, func
+from sqlalchemy.ext.hybrid import hybrid_property
+from database import Base
+from models.db_brochure import compute_brochure_status
+
+class MarketingItem(Base):
+    """
+    Denormalized read model for GET /api/v1/marketing-items.
+    One row per visible service/brochure, kept in step by utils/marketing_sync_util.py
+    inside the same transaction as the source write.
+    """
+    __tablename__ = "marketing_items"
+
+    id = Column(Integer, primary_key=True)
+    item_type = Column(String(20), nullable=False)  # "service" / "brochure"
+    source_id = Column(Integer, nullable=False)
+    branch_key = Column(String(64))  # services use int branch ids, brochures UUIDs
+    title = Column(String, nullable=False, default="")
+    category = Column(String, nullable=True)
+    cta = Column(String, nullable=True)
+    base_status = Column(String, default="active")
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    infinite = Column(Boolean, default=False)
+    sort_date = Column(Date, nullable=False)  # start_date, or creation date when there is none
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("item_type", "source_id", name="uq_marketing_items_source"),
+        Index("ix_marketing_items_branch_sort_date_id", "branch_key", "sort_date", "id"),
+        Index("ix_marketing_items_branch_title_id", "branch_key", "title", "id"),
+    )
+
+    @hybrid_property
+    def lifecycle_status(self):
+        if self.item_type == "service":
+            return self.base_status
+        return compute_brochure_status(self.base_status, self.start_date, self.end_date, self.infinite)
+
+    @lifecycle_status.expression
+    def lifecycle_status(cls):
+        today = func.current_date()
+        return case(
+            (cls.item_type == "service", cls.base_status),
+            (cls.base_status == "archived", "archived"),
+            (cls.infinite.is_(True), "active"),
+            (cls.start_date > today, "coming_soon"),
+            (cls.end_date < today, "expired"),
+            else_="active"
+        )
+
+    def to_dict(self):
+        return {
+            "type": self.item_type,
+            "title": self.title,
+            "status": self.lifecycle_status,
+            "cta": self.cta,
+            "category": self.category,
+            "start_date": self.start_date,
+            "end_date": self.end_date
+        }
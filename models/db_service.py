@@ -1,7 +1,10 @@
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy import Column, Computed, Integer, String, Numeric, Boolean, DateTime, Index, func
+from sqlalchemy.orm import deferred
 from database import Base
+from utils.search_util import search_vector_sql
+from utils.pagination_util import title_sort_key
 
 class ServiceDB(Base):
     __tablename__ = "services"
@@ -17,3 +20,19 @@ class ServiceDB(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     tags = Column(ARRAY(String), nullable=True, default=[])
+    # Maintained by Postgres; deferred so normal loads never fetch it
+    search_vector = deferred(Column(TSVECTOR, Computed(search_vector_sql(("name", "A"), ("description", "B")), persisted=True)))
+
+    __table_args__ = (
+        # Keyset pagination per branch (ordered by id or created_at)
+        Index("ix_services_branch_id_id", "branch_id", "id"),
+        Index("ix_services_branch_created_at_id", "branch_id", "created_at", "id"),
+        # Live marketing feed ordered by title (routers/marketing_items.py)
+        Index("ix_services_branch_name_c_id", "branch_id", title_sort_key(name), "id"),
+        # Slug family lookups in utils/auto_generate_util.allocate_unique_slugs
+        Index("ix_services_slug_family", func.regexp_replace(slug, r"-\d+$", "")),
+        # Full-text search (routers/search.py)
+        Index("ix_services_search_vector", "search_vector", postgresql_using="gin"),
+        # ?tags= filters (&&, @>) and tag facets
+        Index("ix_services_tags", "tags", postgresql_using="gin"),
+    )
@@ -1,6 +1,7 @@
 
-from pydantic import BaseModel
-from typing import Optional
+from datetime import date
+from pydantic import BaseModel, field_validator
+from typing import List, Literal, Optional
 
 class ServiceBase(BaseModel):
     name: str
@@ -14,6 +15,24 @@ class ServiceBase(BaseModel):
 class ServiceCreate(ServiceBase):
     pass
 
+class ServiceImport(ServiceCreate):
+    """One row of a bulk import; CSV tags come as "a,b,c" """
+    tags: Optional[List[str]] = None
+
+    @field_validator("name")
+    @classmethod
+    def name_not_blank(cls, value):
+        if not value.strip():
+            raise ValueError("Name cannot be blank")
+        return value.strip()
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def split_tags(cls, value):
+        if isinstance(value, str):
+            return [tag.strip() for tag in value.split(",") if tag.strip()]
+        return value
+
 class ServiceUpdate(BaseModel):
     name: Optional[str]
     description: Optional[str]
@@ -22,6 +41,27 @@ class ServiceUpdate(BaseModel):
     slug: Optional[str]
     image_url: Optional[str]
 
+class ServiceBulkFilter(BaseModel):
+    branch_id: Optional[int] = None
+    tag: Optional[str] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+class ServicePatch(BaseModel):
+    """Fields a bulk update may set; code and slug stay per-item"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    image_url: Optional[str] = None
+    branch_id: Optional[int] = None
+    tags: Optional[List[str]] = None
+
+class ServiceBulkAction(BaseModel):
+    action: Literal["update", "archive", "restore"]
+    ids: Optional[List[int]] = None
+    filter: Optional[ServiceBulkFilter] = None
+    patch: Optional[ServicePatch] = None
+
 class Service(ServiceBase):
     id: int
 
@@ -1,12 +1,27 @@
 import os
 import logging
-from uuid import uuid4, UUID
-from fastapi import APIRouter, Depends, HTTPException, Header, Form, File, UploadFile, status
-from sqlalchemy.orm import Session
-from models.db_brochure import Brochure
-from database import get_db
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Form, File, UploadFile, Request, status
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db_brochure import Brochure, BROCHURE_STATUSES
+from models.brochure_model import BrochureBulkAction, BrochureImport
+from database import AsyncSessionLocal, get_db, read_session
+from utils.response_cache_util import cached_json_response, response_cache
+from utils.marketing_cache_util import branch_cache_key, invalidate_branch_feed
+from utils.marketing_sync_util import sync_marketing_item
 from utils.utils_cta_status import generate_whatsapp_cta_link_ar
-from datetime import date, datetime
+from utils.auto_generate_util import generate_unique_code, generate_unique_slug
+from utils.upload_util import save_image_upload
+from utils.image_derivatives_util import build_derivatives
+from utils.bulk_import_util import read_import_rows, validate_rows, import_rows, import_report
+from utils.bulk_update_util import bulk_conditions, bulk_update
+from utils.export_util import export_response
+from utils.fieldset_util import FieldSet, column_field
+from utils.tag_util import TAG_MODES, cached_tag_facets, invalidate_tag_facets, normalize_tags, parse_tags_param, tag_facet_query, tag_filter
+from utils.logging_db_util import log_admin_actions
+from utils.jwt_auth_util import AdminContext, admin_branch, require_roles
+from datetime import datetime
 from copy import deepcopy
 from typing import Optional, List
 from sqlalchemy.exc import IntegrityError
@@ -15,6 +30,51 @@ from sqlalchemy.exc import IntegrityError
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Brochures"])
 
+# Bearer JWT (or legacy x-admin-token) with an editing role
+require_editor = require_roles("super_admin", "post_admin")
+
+def _write_branch(admin, x_admin_branch):
+    # Token branch for bearer callers, the header for legacy ones
+    branch_id = admin_branch(admin, x_admin_branch, UUID)
+    if branch_id is None:
+        raise HTTPException(status_code=400, detail="x-admin-branch header is required")
+    return branch_id
+
+BROCHURE_IMAGE_DIR = "static/brochures"
+BROCHURE_IMAGE_URL = "/static/brochures"
+
+async def attach_image_variants(brochure_id, image_path, image_hash):
+    """Background task: render thumb/card/full + placeholder, then record their URLs"""
+    async with AsyncSessionLocal() as db:
+        # Derivatives are keyed by content hash, so a re-used image is rendered once
+        existing = (await db.execute(
+            select(Brochure.image_variants, Brochure.image_placeholder)
+            .where(Brochure.image_hash == image_hash, Brochure.image_variants.isnot(None))
+            .limit(1)
+        )).first()
+    if existing:
+        variants, placeholder = existing
+    else:
+        shard_dir = os.path.dirname(image_path)
+        try:
+            variants, placeholder = await build_derivatives(
+                os.path.join(BROCHURE_IMAGE_DIR, image_path), os.path.join(BROCHURE_IMAGE_DIR, shard_dir), image_hash
+            )
+        except Exception as e:
+            logger.error(f"Image derivatives failed for brochure {brochure_id}: {str(e)}")
+            return
+        for variant in variants.values():
+            variant["jpg"] = f"{BROCHURE_IMAGE_URL}/{shard_dir}/{variant['jpg']}"
+            variant["webp"] = f"{BROCHURE_IMAGE_URL}/{shard_dir}/{variant['webp']}"
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Brochure)
+            .where(Brochure.id == brochure_id)
+            .values(image_variants=variants, image_placeholder=placeholder)
+        )
+        await db.commit()
+    response_cache.invalidate("brochures")
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -31,14 +91,17 @@ router = APIRouter(tags=["Brochures"])
                 }
             }
         },
-        400: {"description": "Invalid input (e.g., blank title, malformed date)"},
+        400: {"description": "Invalid input (e.g., blank title, malformed date, not a JPG/PNG)"},
         409: {"description": "Brochure code already exists"},
+        413: {"description": "Image too large"},
         500: {"description": "Internal server error"}
     },
     summary="Create a new brochure",
     description="""
     Creates a brochure with:
-    - Image upload (saved to `/static/brochures/`)
+    - Image upload (JPG/PNG detected from file content, size-limited), stored once per content hash
+      under `/static/brochures/ab/cd/<sha256>.<ext>`
+    - Thumb/card/full JPEG + WebP variants and a blur placeholder, rendered after the response is sent
     - Automatic WhatsApp CTA link generation
     - Date-based status logic (`active`/`coming_soon`/`expired`)
     
@@ -48,6 +111,7 @@ router = APIRouter(tags=["Brochures"])
     """
 )
 async def create_brochure(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     category: str = Form(...),
@@ -56,15 +120,17 @@ async def create_brochure(
     start_date: str = Form(None),
     end_date: str = Form(None),
     cta_override: str = Form(None),
-    code: str = Form(...),
+    code: str = Form(None),
     status: str = Form("active"),
     cta_phone: str = Form(...),
     image: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    branch_id: UUID = Header(..., alias="x-admin-branch")
+    admin: AdminContext = Depends(require_editor),
+    db: AsyncSession = Depends(get_db),
+    x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch")
 ):
+    branch_id = _write_branch(admin, x_admin_branch)
     try:
-        logger.debug(f"Brochure creation attempt - Code: {code}, Branch: {branch_id}")
+        logger.debug(f"Brochure creation attempt by {admin.name} - Code: {code}, Branch: {branch_id}")
 
         # Enhanced validation
         if not title.strip():
@@ -92,77 +158,279 @@ async def create_brochure(
         if start_date_parsed and end_date_parsed and start_date_parsed > end_date_parsed:
             raise HTTPException(status_code=400, detail="Start date cannot be after end date")
 
-        # Secure image handling
-        ext = os.path.splitext(image.filename)[-1].lower()
-        if ext not in ('.jpg', '.jpeg', '.png'):
-            raise HTTPException(status_code=400, detail="Only JPG/PNG images allowed")
-            
-        unique_filename = f"{uuid4().hex}{ext}"
-        os.makedirs("static/brochures", exist_ok=True)
-        save_path = f"static/brochures/{unique_filename}"
-        
-        with open(save_path, "wb") as buffer:
-            buffer.write(await image.read())
+        # Secure image handling: type from magic bytes, copied to the store in chunks,
+        # named by sha256 so duplicates share one file (immutable URL)
+        image_path, _, image_hash = await save_image_upload(image, BROCHURE_IMAGE_DIR)
 
         brochure_data = {
             "title": title,
             "description": description,
             "category": category,
             "price": price,
-            "slug": slug,
+            "slug": None,
             "start_date": start_date_parsed,
             "expiry_date": end_date_parsed,
             "cta_override": cta_override.strip() if cta_override else None,
             "code": code,
             "status": status,
             "cta_phone": cta_phone,
-            "image_url": f"/static/brochures/{unique_filename}",
+            "image_url": f"{BROCHURE_IMAGE_URL}/{image_path}",
+            "image_hash": image_hash,
             "branch_id": branch_id
         }
 
-        new_brochure = Brochure(**brochure_data)
-
-        # Enhanced status logic
-        today = date.today()
-        if start_date_parsed and start_date_parsed > today:
-            new_brochure.status = "coming_soon"
-        elif end_date_parsed and end_date_parsed < today:
-            new_brochure.status = "expired"
-        else:
-            new_brochure.status = status
-
-        db.add(new_brochure)
-        db.commit()
-        db.refresh(new_brochure)
-
-        new_brochure.cta_link = generate_whatsapp_cta_link_ar(
-            phone_number=cta_phone,
-            title=new_brochure.title,
-            item_code=new_brochure.code,
-            item_type="brochure"
-        )
+        base_slug = slug.strip() if slug else None
+        auto_code = not code or not code.strip()
+        # A concurrent create can take the same free slug between allocation and insert:
+        # allocate once more before answering 409
+        for attempt in range(2):
+            if base_slug:
+                brochure_data["slug"] = await generate_unique_slug(base_slug, db, Brochure)
+            # Auto-generate code if not supplied (MMYY-BUN-NNN); reserved right before the
+            # insert since the counter row stays locked until commit (a rollback returns it)
+            if auto_code:
+                brochure_data["code"] = code = await generate_unique_code(datetime.utcnow().strftime("%m%y") + "-BUN", db, Brochure)
+
+            # Only the admin-set status is stored; coming_soon/expired are derived
+            # from the dates at read time (Brochure.lifecycle_status)
+            new_brochure = Brochure(**brochure_data)
+            # CTA only needs the title and code, so it goes in with the insert (one commit)
+            new_brochure.cta_link = generate_whatsapp_cta_link_ar(
+                phone_number=cta_phone,
+                title=new_brochure.title,
+                item_code=new_brochure.code,
+                item_type="brochure"
+            )
 
-        db.commit()
-        db.refresh(new_brochure)
-        return {"success": True, "id": new_brochure.id, "cta_link": new_brochure.cta_link}
+            db.add(new_brochure)
+            try:
+                await db.flush()
+                await sync_marketing_item(db, "brochure", new_brochure)
+                await db.commit()
+                break
+            except IntegrityError as e:
+                if attempt == 0 and "brochures_slug_key" in str(e):
+                    await db.rollback()
+                    continue
+                raise
+        response_cache.invalidate("brochures")
+        invalidate_tag_facets("brochures")
+        invalidate_branch_feed(branch_id)
+        await log_admin_actions(admin.name, admin.role, "Create", "Brochure", [new_brochure.id])
+        # Resizing is CPU-bound: done in the process pool once the response is out
+        background_tasks.add_task(attach_image_variants, new_brochure.id, image_path, image_hash)
+        return {
+            "success": True,
+            "id": new_brochure.id,
+            "cta_link": new_brochure.cta_link,
+            "status": new_brochure.lifecycle_status
+        }
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "brochures_code_key" in str(e):
             logger.warning(f"Duplicate code attempt: {code} (Branch: {branch_id})")
             raise HTTPException(status_code=409, detail="Brochure code already exists")
+        if "brochures_slug_key" in str(e):
+            raise HTTPException(status_code=409, detail=f"Slug '{slug.strip()}' is being used by another request, please retry")
         logger.error(f"Database integrity error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error creating brochure: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating brochure: {str(e)}")
 
+@router.post(
+    "/import",
+    summary="Bulk import brochures",
+    description="""
+    Creates brochures from a CSV (header row) or NDJSON file; columns match the create form
+    (`end_date` or `expiry_date`, comma-separated `tags`, optional existing `image_url`).
+    Rows are validated up front, missing codes come from one counter update per chunk,
+    slugs are de-duplicated in bulk and rows are inserted in chunked transactions.
+    The response lists created ids plus a per-row error report.
+    """
+)
+async def import_brochures(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    admin: AdminContext = Depends(require_editor),
+    x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch"),
+    db: AsyncSession = Depends(get_db)
+):
+    role = admin.role
+    branch_id = _write_branch(admin, x_admin_branch)
+
+    rows, parse_errors = await read_import_rows(file, format)
+    valid, validation_errors = validate_rows(rows, BrochureImport)
+
+    def prepare(values):
+        values["branch_id"] = branch_id
+        values["tags"] = normalize_tags(values.get("tags"))
+        values["cta_override"] = values["cta_override"].strip() if values.get("cta_override") else None
+        values["cta_link"] = generate_whatsapp_cta_link_ar(
+            phone_number=values["cta_phone"],
+            title=values["title"],
+            item_code=values["code"],
+            item_type="brochure"
+        )
+
+    prefix = datetime.utcnow().strftime("%m%y") + "-BUN"
+    created, insert_errors = await import_rows(db, Brochure, "brochure", valid, prefix, prepare)
+    if created:
+        response_cache.invalidate("brochures")
+        invalidate_tag_facets("brochures")
+        invalidate_branch_feed(branch_id)
+
+    admin_user = admin.name
+    await log_admin_actions(admin_user, role, "Import", "Brochure", [brochure.id for _, brochure in created])
+
+    report = import_report(len(rows) + len(parse_errors), created, parse_errors + validation_errors + insert_errors)
+    return {"success": True, **report}
+
+@router.post(
+    "/bulk",
+    summary="Bulk update / archive / restore brochures",
+    description="""
+    Applies `patch` (action `update`), archives or restores every brochure matching `ids`
+    and/or `filter` (branch_id, category, tag, date_from..date_to on the start date) with
+    a single `UPDATE ... WHERE`. Scoped to the caller's branch (token claim, or `x-admin-branch`), which only super admins may omit.
+    Returns the affected count and ids.
+    """
+)
+async def bulk_brochures(
+    bulk: BrochureBulkAction,
+    request: Request,
+    admin: AdminContext = Depends(require_editor),
+    x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch"),
+    db: AsyncSession = Depends(get_db)
+):
+    role = admin.role
+
+    filters = []
+    if bulk.filter:
+        if bulk.filter.branch_id:
+            filters.append(Brochure.branch_id == bulk.filter.branch_id)
+        if bulk.filter.category:
+            filters.append(Brochure.category == bulk.filter.category)
+        if bulk.filter.tag:
+            filters.append(Brochure.tags.contains([bulk.filter.tag.lower()]))
+        if bulk.filter.date_from:
+            filters.append(Brochure.effective_start >= bulk.filter.date_from)
+        if bulk.filter.date_to:
+            filters.append(Brochure.effective_start <= bulk.filter.date_to)
+    conditions = bulk_conditions(Brochure, bulk.ids, filters)
+    conditions.append(Brochure.is_deleted == False)
+    # Token branch for bearer callers, the header for legacy ones; required unless super admin
+    scope = admin_branch(admin, x_admin_branch, UUID)
+    if scope is None and role != "super_admin":
+        raise HTTPException(status_code=400, detail="x-admin-branch header is required")
+    if scope is not None:
+        conditions.append(Brochure.branch_id == scope)
+
+    if bulk.action == "update":
+        values = bulk.patch.model_dump(exclude_unset=True) if bulk.patch else {}
+        if not values:
+            raise HTTPException(status_code=400, detail="patch is required for update")
+        if values.get("tags") is not None:
+            values["tags"] = normalize_tags(values["tags"])
+        # Patching one side of the date range skips rows where it would cross the other side
+        if values.get("start_date") and "expiry_date" not in values:
+            conditions.append(or_(Brochure.expiry_date.is_(None), Brochure.expiry_date >= values["start_date"]))
+        if values.get("expiry_date") and "start_date" not in values:
+            conditions.append(or_(Brochure.start_date.is_(None), Brochure.start_date <= values["expiry_date"]))
+    elif bulk.action == "archive":
+        values = {"status": "archived"}
+        conditions.append(Brochure.status != "archived")
+    else:
+        values = {"status": "active"}
+        conditions.append(Brochure.status == "archived")
+
+    updated = await bulk_update(db, Brochure, "brochure", conditions, values)
+    if updated:
+        response_cache.invalidate("brochures")
+        invalidate_tag_facets("brochures")
+        invalidate_branch_feed(*[brochure.branch_id for brochure in updated])
+
+    admin_user = admin.name
+    await log_admin_actions(admin_user, role, f"Bulk{bulk.action.capitalize()}", "Brochure", [brochure.id for brochure in updated])
+
+    return {"success": True, "action": bulk.action, "affected": len(updated), "ids": [brochure.id for brochure in updated]}
+
+# Exported columns; same names the bulk import reads back
+BROCHURE_EXPORT_COLUMNS = (
+    Brochure.id, Brochure.code, Brochure.slug, Brochure.title, Brochure.description,
+    Brochure.category, Brochure.price, Brochure.branch_id, Brochure.status,
+    Brochure.lifecycle_status.label("lifecycle_status"), Brochure.start_date, Brochure.expiry_date,
+    Brochure.infinite, Brochure.tags, Brochure.cta_phone, Brochure.cta_override, Brochure.cta_link,
+    Brochure.image_url, Brochure.created_at
+)
+
+@router.get(
+    "/export",
+    summary="Export brochures",
+    description="Streams brochures as CSV (`format=csv`) or NDJSON (`format=ndjson`) from a server-side cursor; same filters as the list"
+)
+async def export_brochures(
+    format: str = "csv",
+    branch_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    admin: AdminContext = Depends(require_roles()),
+    x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch")
+):
+    if status and status not in BROCHURE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {list(BROCHURE_STATUSES)}")
+
+    stmt = select(*BROCHURE_EXPORT_COLUMNS).where(Brochure.is_deleted == False)
+    # The caller's branch (token claim or header) always applies; branch_id can only narrow it
+    scope = admin_branch(admin, x_admin_branch, UUID)
+    if scope:
+        stmt = stmt.where(Brochure.branch_id == scope)
+    if branch_id:
+        stmt = stmt.where(Brochure.branch_id == branch_id)
+    if status:
+        stmt = stmt.where(Brochure.status_filter(status))
+    return export_response(stmt.order_by(Brochure.id), format, "brochures")
+
+# ?fields= whitelist; status is computed by Postgres alongside the row
+BROCHURE_FIELDS = FieldSet(
+    {
+        "id": column_field(Brochure.id),
+        "branch_id": column_field(Brochure.branch_id),
+        "title": column_field(Brochure.title),
+        "description": column_field(Brochure.description),
+        "category": column_field(Brochure.category),
+        "code": column_field(Brochure.code),
+        "slug": column_field(Brochure.slug),
+        "image_url": column_field(Brochure.image_url),
+        "image_variants": column_field(Brochure.image_variants),
+        "image_placeholder": column_field(Brochure.image_placeholder),
+        "start_date": column_field(Brochure.start_date),
+        "expiry_date": column_field(Brochure.expiry_date),
+        "infinite": column_field(Brochure.infinite),
+        "price": column_field(Brochure.price),
+        "tags": column_field(Brochure.tags, lambda tags: tags or []),
+        "cta_link": column_field(Brochure.cta_link),
+        "status": column_field(Brochure.lifecycle_status.label("status")),
+        "created_at": column_field(Brochure.created_at),
+    },
+    # List view default: no description / image hash
+    default=(
+        "id", "branch_id", "title", "category", "code", "slug", "image_url", "image_variants",
+        "image_placeholder", "start_date", "expiry_date", "infinite", "price", "tags", "cta_link",
+        "status", "created_at"
+    )
+)
+
 @router.get(
     "/",
     response_model=List[dict],
     summary="List all brochures",
-    description="Returns active brochures filtered by branch_id if provided",
+    description="Returns brochures filtered by branch_id, status (`active`/`coming_soon`/`expired`/`archived`) and `tags=a,b` (`tags_mode=any|all`) if provided; `fields=id,title,image_url,cta_link` returns only those fields",
     responses={
         200: {
             "description": "List of brochures",
@@ -178,20 +446,65 @@ async def create_brochure(
         }
     }
 )
-def get_brochures(
+async def get_brochures(
+    request: Request,
     branch_id: Optional[UUID] = None,
-    db: Session = Depends(get_db),
+    status: Optional[str] = None,
+    tags: Optional[str] = None,
+    tags_mode: str = "any",
+    fields: Optional[str] = None,
     x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch")
 ):
-    try:
-        query = db.query(Brochure).filter(Brochure.is_deleted == False)
-        if branch_id:
-            query = query.filter(Brochure.branch_id == branch_id)
-        elif x_admin_branch:
-            query = query.filter(Brochure.branch_id == x_admin_branch)
-        return [b.to_dict() for b in query.order_by(Brochure.created_at.desc()).all()]
-    except Exception as e:
-        logger.error(f"Error fetching brochures: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    if status and status not in BROCHURE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {list(BROCHURE_STATUSES)}")
+    if tags_mode not in TAG_MODES:
+        raise HTTPException(status_code=400, detail=f"tags_mode must be one of {list(TAG_MODES)}")
+    tag_list = parse_tags_param(tags)
+    # ?fields=id,title,image_url,cta_link narrows both the SELECT list and each item
+    field_names = BROCHURE_FIELDS.parse(fields)
+
+    async def build():
+        try:
+            # Status is computed by Postgres alongside the row instead of per row in Python
+            stmt = select(*BROCHURE_FIELDS.columns(field_names)).where(Brochure.is_deleted == False)
+            if branch_id:
+                stmt = stmt.where(Brochure.branch_id == branch_id)
+            elif x_admin_branch:
+                stmt = stmt.where(Brochure.branch_id == x_admin_branch)
+            if status:
+                stmt = stmt.where(Brochure.status_filter(status))
+            if tag_list:
+                # any -> overlap (&&), all -> contains (@>); both use the GIN index on tags
+                stmt = stmt.where(tag_filter(Brochure.tags, tag_list, tags_mode))
+            async with read_session() as db:
+                rows = (await db.execute(stmt.order_by(Brochure.created_at.desc()))).all()
+            return [BROCHURE_FIELDS.item(row, field_names) for row in rows]
+        except Exception as e:
+            logger.error(f"Error fetching brochures: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    # Database is only touched on a cache miss; unchanged lists revalidate with 304
+    return await cached_json_response(request, "brochures", build)
+
+@router.get(
+    "/tags",
+    summary="Brochure tag counts",
+    description="Per-tag counts of non-archived brochures for a branch (`branch_id` or `x-admin-branch`), cached until the next brochure write"
+)
+async def get_brochure_tag_facets(
+    branch_id: Optional[UUID] = None,
+    x_admin_branch: Optional[UUID] = Header(default=None, alias="x-admin-branch")
+):
+    branch = branch_id or x_admin_branch
+
+    async def load():
+        conditions = [Brochure.is_deleted == False, Brochure.status != "archived"]
+        if branch:
+            conditions.append(Brochure.branch_id == branch)
+        async with read_session() as db:
+            rows = (await db.execute(tag_facet_query(Brochure, *conditions))).all()
+        return [{"tag": tag, "count": count} for tag, count in rows]
+
+    return {"success": True, "tags": await cached_tag_facets("brochures", branch_cache_key(branch), load)}
 
 # [Other endpoints (GET by ID, PUT, DELETE, etc.) follow same enhanced pattern...]
\ No newline at end of file
@@ -2,27 +2,19 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from sqlalchemy.orm import Session
-from database import SessionLocal
-from models.db_brochure import BrochureDB
+from database import get_sync_db as get_db
+from models.db_brochure import Brochure as BrochureDB
 from models.brochure_model import Brochure, BrochureCreate, BrochureUpdate
 from utils.logging_db_util import log_admin_action as log_db_action
 from utils.logging_debug_util import log_admin_action as log_debug_action
 from utils.role_check_util import check_role
 from utils.response_wrapper import success_response, error_response
 from utils.pagination_util import apply_pagination
-from typing import List
-from datetime import date
+from typing import List, Optional
 from urllib.parse import urlencode
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def generate_cta_link_brochure(brochure):
     if not brochure:
         return ""
@@ -34,28 +26,8 @@ def generate_cta_link_brochure(brochure):
     return f"{base_url}?{urlencode(params, encoding='utf-8')}"
 
 def calculate_status(brochure):
-    today = date.today()
-    if not brochure.is_active:
-        return "archived"
-    elif brochure.infinite:
-        return "active"
-    elif brochure.start_date and brochure.start_date > today:
-        return "scheduled"
-    elif brochure.expiry_date and brochure.expiry_date < today:
-        return "archived"
-    else:
-        return "active"
-
-    result = []
-    for b in brochures:
-        b_data = Brochure.from_orm(b).dict()
-        # Inject CTA link
-        b_data["cta_link"] = generate_cta_link_brochure(b)
-        # Inject Status
-        b_data["status"] = calculate_status(b)
-        result.append(b_data)
-    paginated = apply_pagination(result, page, limit)
-    return success_response(data=paginated, message="Brochures fetched successfully")
+    # Same rules Postgres applies through BrochureDB.lifecycle_status
+    return brochure.lifecycle_status
 
 @router.post("/", response_model=Brochure)
 def create_brochure(brochure: BrochureCreate, request: Request, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
@@ -213,17 +185,20 @@ def get_brochures(
     status: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(BrochureDB)
+    query = db.query(BrochureDB, BrochureDB.lifecycle_status)
     if branch_id:
         query = query.filter(BrochureDB.branch_id == branch_id)
+    if status:
+        try:
+            query = query.filter(BrochureDB.status_filter(status))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     brochures = query.all()
     result = []
-    for b in brochures:
+    for b, computed_status in brochures:
         b_data = Brochure.from_orm(b).dict()
         b_data["cta_link"] = generate_cta_link_brochure(b)
-        b_data["status"] = calculate_brochure_status(b.start_date, b.expiry_date, b.is_active)
-        if status and b_data["status"] != status:
-            continue
+        b_data["status"] = computed_status
         result.append(b_data)
     paginated = apply_pagination(result, page, limit)
     return success_response(data=paginated, message="Brochures fetched successfully")
\ No newline at end of file
@@ -0,0 +1,78 @@
+# Internal operational endpoints (super admin only)
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from database import pool_stats, replica_pool_stats, replica_health
+from utils.jwt_auth_util import claim_cache, revocation_list, require_roles
+from utils.response_wrapper import success_response
+from utils.response_cache_util import response_cache
+from utils import read_after_write_util
+from utils.read_after_write_util import READ_YOUR_WRITES_SECONDS
+from utils.marketing_cache_util import marketing_feed_cache
+from utils.tag_util import tag_facet_cache
+from utils.password_util import password_verifier
+from utils.rate_limit_util import login_ip_limiter, login_account_limiter
+from utils.logging_db_util import audit_log_queue
+from utils.export_util import export_response
+from models.db_logs import AdminActionLog
+
+# Every endpoint here is super admin only (bearer JWT or legacy x-admin-token)
+router = APIRouter(dependencies=[Depends(require_roles("super_admin"))])
+
+@router.get("/stats/pool")
+def get_pool_stats():
+    data = {"primary": pool_stats.snapshot()}
+    if replica_pool_stats is not None:
+        data["replica"] = {
+            **replica_pool_stats.snapshot(),
+            "health": replica_health.snapshot(),
+            "read_your_writes": {"window_seconds": READ_YOUR_WRITES_SECONDS, "primary_reads": read_after_write_util.primary_reads}
+        }
+    return success_response(data=data, message="Pool stats fetched successfully")
+
+@router.get("/stats/cache")
+def get_cache_stats():
+    data = {
+        "responses": response_cache.stats(),
+        "marketing_feed": marketing_feed_cache.stats(),
+        "tag_facets": tag_facet_cache.stats()
+    }
+    return success_response(data=data, message="Cache stats fetched successfully")
+
+@router.get("/stats/audit-log")
+def get_audit_log_stats():
+    return success_response(data=audit_log_queue.stats(), message="Audit log stats fetched successfully")
+
+@router.get("/stats/auth")
+def get_auth_stats():
+    data = {
+        "password_verifier": password_verifier.stats(),
+        "rate_limits": [login_ip_limiter.stats(), login_account_limiter.stats()],
+        "jwt_claim_cache": claim_cache.stats(),
+        "revocations": revocation_list.stats()
+    }
+    return success_response(data=data, message="Auth stats fetched successfully")
+
+@router.get("/audit-log/export")
+def export_audit_log(
+    format: str = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_name: Optional[str] = None,
+    action: Optional[str] = None
+):
+    """Stream admin action logs (oldest first) as CSV or NDJSON"""
+    stmt = select(
+        AdminActionLog.id, AdminActionLog.timestamp, AdminActionLog.admin_name, AdminActionLog.role,
+        AdminActionLog.action, AdminActionLog.item_type, AdminActionLog.item_id, AdminActionLog.notes
+    )
+    if since:
+        stmt = stmt.where(AdminActionLog.timestamp >= since)
+    if until:
+        stmt = stmt.where(AdminActionLog.timestamp < until)
+    if admin_name:
+        stmt = stmt.where(AdminActionLog.admin_name == admin_name)
+    if action:
+        stmt = stmt.where(AdminActionLog.action == action)
+    return export_response(stmt.order_by(AdminActionLog.id), format, "admin_action_logs")
@@ -1,63 +1,161 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+import os
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from sqlalchemy import false, select
+from database import read_session
 from models.db_service import ServiceDB as Service
 from models.db_brochure import Brochure
-from utils.utils_cta_status import generate_whatsapp_cta_link_ar
-from datetime import datetime
+from models.db_marketing_item import MarketingItem
+from utils.pagination_util import paginate_query, decode_cursor, title_sort_key
+from utils.feed_merge_util import MergeSource, merge_page, decode_merge_cursor
+from utils.utils_cta_status import generate_whatsapp_cta_link_ar, generate_cta_link_service, calculate_service_status
+from utils.marketing_cache_util import marketing_feed_cache, branch_cache_key
 from pydantic import BaseModel
 from datetime import date
+from typing import Optional
+from uuid import UUID
 
 router = APIRouter(tags=["Marketing Items"])
 
+# "live" merges the source tables at request time; "read_model" serves the feed from
+# the marketing_items table; switch only after setup_db --rebuild-marketing-items has run
+MARKETING_FEED_SOURCE = os.getenv("MARKETING_FEED_SOURCE", "live")
+
+READ_MODEL_SORT_COLUMNS = {
+    "start_date": MarketingItem.sort_date,
+    "title": MarketingItem.title
+}
+
 @router.get("/test")
 def test_marketing_item():
     return {"message": "Marketing endpoint is reachable"}
 
-@router.get("/")
-def get_marketing_items(
-    db: Session = Depends(get_db),
-    x_admin_branch: int = Header(default=None)
-):
-    now = datetime.utcnow()
+def _branch_filters(x_admin_branch: Optional[str]):
+    """
+    services.branch_id is an integer while brochures.branch_id is a UUID,
+    so match the header against whichever type it parses as.
+    """
+    if x_admin_branch is None:
+        return Service.branch_id.is_(None), Brochure.branch_id.is_(None)
+    service_filter = Service.branch_id == int(x_admin_branch) if x_admin_branch.isdigit() else false()
+    try:
+        brochure_filter = Brochure.branch_id == UUID(x_admin_branch)
+    except ValueError:
+        brochure_filter = false()
+    return service_filter, brochure_filter
 
-    services = db.query(Service).filter(
-        Service.branch_id == x_admin_branch,
-        Service.soft_delete == False
-    ).all()
+def _service_item(svc):
+    return {
+        "type": "service",
+        "title": svc.name,
+        "status": calculate_service_status(svc),
+        "cta": generate_cta_link_service(svc),
+        "category": None,
+        "start_date": None,
+        "end_date": None
+    }
 
-    brochures = db.query(Brochure).filter(
-        Brochure.branch_id == x_admin_branch,
-        Brochure.soft_delete == False
-    ).all()
+def _brochure_item(bro):
+    return {
+        "type": "brochure",
+        "title": bro.title,
+        "status": bro.lifecycle_status,
+        "cta": bro.cta_link or generate_whatsapp_cta_link_ar(bro.cta_phone, bro.title, bro.code, "brochure"),
+        "category": bro.category,
+        "start_date": bro.start_date,
+        "end_date": bro.expiry_date
+    }
 
-    service_items = [
-        {
-            "type": "service",
-            "title": svc.title,
-            "status": "active",  # placeholder since determine_status not defined
-            "cta": generate_whatsapp_cta_link_ar(svc.title, svc.phone),
-            "category": svc.category,
-            "start_date": svc.start_date,
-            "end_date": svc.expiry_date
-        }
-        for svc in services
+def _live_sources(x_admin_branch: Optional[str], sort: str):
+    service_filter, brochure_filter = _branch_filters(x_admin_branch)
+    services = select(Service).where(service_filter, Service.is_active == True)
+    brochures = select(Brochure).where(brochure_filter, Brochure.is_deleted == False)
+    if sort == "title":
+        # C collation so Postgres orders titles the way the Python merge compares them;
+        # each side is an index range scan (ix_services_branch_name_c_id, ix_brochures_branch_title_c_id)
+        return [
+            MergeSource("service", services, title_sort_key(Service.name), Service.id,
+                        lambda svc, value: value, _service_item),
+            MergeSource("brochure", brochures, title_sort_key(Brochure.title), Brochure.id,
+                        lambda bro, value: value, _brochure_item),
+        ]
+    # start_date: services have none, so they are placed by creation date (same as the read model).
+    # Rows without a date sort last in SQL, so they merge last (date.max) too
+    return [
+        MergeSource("service", services, Service.created_at, Service.id,
+                    lambda svc, value: value.date() if value else date.max, _service_item),
+        MergeSource("brochure", brochures, Brochure.effective_start, Brochure.id,
+                    lambda bro, value: value or date.max, _brochure_item),
     ]
 
-    brochure_items = [
+async def _load_live_items(x_admin_branch: Optional[str], sort: str, limit: int, cursor: Optional[str]):
+    # k-way merge: each source is read in order, a page at a time, and merged lazily
+    async with read_session() as db:
+        return await merge_page(db, _live_sources(x_admin_branch, sort), sort, limit, cursor)
+
+# Only what the feed shows, plus sort_date/id for the cursor; status computed by Postgres
+READ_MODEL_LIST_COLUMNS = (
+    MarketingItem.id, MarketingItem.item_type, MarketingItem.title,
+    MarketingItem.lifecycle_status.label("status"), MarketingItem.cta, MarketingItem.category,
+    MarketingItem.start_date, MarketingItem.end_date, MarketingItem.sort_date
+)
+
+async def _load_read_model_items(branch_key: Optional[str], sort: str, limit: int, cursor: Optional[str]):
+    # One indexed range scan over (branch_key, <sort column>, id)
+    stmt = select(*READ_MODEL_LIST_COLUMNS)
+    if branch_key is None:
+        stmt = stmt.where(MarketingItem.branch_key.is_(None))
+    else:
+        stmt = stmt.where(MarketingItem.branch_key == branch_key)
+    async with read_session() as db:
+        page = await paginate_query(
+            db, stmt, READ_MODEL_SORT_COLUMNS[sort], MarketingItem.id,
+            limit=limit, cursor=cursor, count_total=False, as_rows=True
+        )
+    items = [
         {
-            "type": "brochure",
-            "title": bro.title,
-            "status": "active",  # placeholder since determine_status not defined
-            "cta": generate_whatsapp_cta_link_ar(bro.title, bro.phone),
-            "category": bro.category,
-            "start_date": bro.start_date,
-            "end_date": bro.expiry_date
+            "type": row.item_type,
+            "title": row.title,
+            "status": row.status,
+            "cta": row.cta,
+            "category": row.category,
+            "start_date": row.start_date,
+            "end_date": row.end_date
         }
-        for bro in brochures
+        for row in page["items"]
     ]
+    return items, page["next_cursor"]
+
+@router.get("/")
+async def get_marketing_items(
+    response: Response,
+    sort: str = "start_date",
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    x_admin_branch: Optional[str] = Header(default=None)
+):
+    if sort not in READ_MODEL_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {list(READ_MODEL_SORT_COLUMNS)}")
+
+    # Landing-page hot path: served from the per-branch cache, reloaded on writes or expiry
+    branch_key = branch_cache_key(x_admin_branch)
+    try:
+        if MARKETING_FEED_SOURCE == "live":
+            if cursor:
+                decode_merge_cursor(cursor, sort)
+            loader = lambda: _load_live_items(branch_key, sort, limit, cursor)
+        else:
+            if cursor:
+                # Read-model cursors carry their sort column; one from another sort is a 400
+                decode_cursor(cursor, READ_MODEL_SORT_COLUMNS[sort].key)
+            loader = lambda: _load_read_model_items(branch_key, sort, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return service_items + brochure_items
+    items, next_cursor = await marketing_feed_cache.get_or_load((branch_key, sort, limit, cursor), loader)
+    # Body stays a plain list for existing clients; the next page is advertised in a header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 # ---------- POST ENDPOINT START ----------
 class MarketingItemCreate(BaseModel):
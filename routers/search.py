@@ -0,0 +1,101 @@
+# Full-text search across services and brochures, ranked, with keyset pagination
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Header, HTTPException, Query
+from sqlalchemy import false, select
+from database import read_session
+from models.db_service import ServiceDB as Service
+from models.db_brochure import Brochure
+from utils.feed_merge_util import MergeSource, merge_page
+from utils.response_wrapper import success_response
+from utils.search_util import build_tsquery, search_condition, search_rank, search_terms
+from utils.utils_cta_status import generate_cta_link_service, calculate_service_status
+
+router = APIRouter(tags=["Search"])
+
+SEARCH_TYPES = ("all", "service", "brochure")
+
+def _service_result(svc):
+    return {
+        "type": "service",
+        "id": svc.id,
+        "title": svc.name,
+        "description": svc.description,
+        "code": svc.code,
+        "slug": svc.slug,
+        "status": calculate_service_status(svc),
+        "cta": generate_cta_link_service(svc)
+    }
+
+def _brochure_result(bro):
+    return {
+        "type": "brochure",
+        "id": bro.id,
+        "title": bro.title,
+        "description": bro.description,
+        "category": bro.category,
+        "code": bro.code,
+        "slug": bro.slug,
+        "status": bro.lifecycle_status,
+        "cta": bro.cta_link,
+        "image_url": bro.image_url
+    }
+
+def _rank_source(name, model, stmt, tsquery, to_item):
+    # Best match first: ascending on the negated rank, id breaks ties
+    return MergeSource(name, stmt, -search_rank(model.search_vector, tsquery), model.id,
+                       lambda entity, value: value, to_item)
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: str = "all",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    x_admin_branch: Optional[str] = Header(default=None, alias="x-admin-branch")
+):
+    """
+    Matches every term of q (as a prefix) in title/name, description and category,
+    after the same Arabic normalization the index uses (alef/ya/ta marbuta folding,
+    diacritics removed). Results are ordered by rank; pass next_cursor for the next page.
+    """
+    if type not in SEARCH_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of {list(SEARCH_TYPES)}")
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Query has no searchable words")
+    tsquery = build_tsquery(terms)
+
+    sources = []
+    if type in ("all", "service"):
+        stmt = select(Service).where(search_condition(Service.search_vector, tsquery), Service.is_active == True)
+        if x_admin_branch:
+            # services.branch_id is an integer, brochures.branch_id a UUID
+            stmt = stmt.where(Service.branch_id == int(x_admin_branch) if x_admin_branch.isdigit() else false())
+        sources.append(_rank_source("service", Service, stmt, tsquery, _service_result))
+    if type in ("all", "brochure"):
+        # Public search shows what is live now, like the services branch (is_active)
+        stmt = select(Brochure).where(
+            search_condition(Brochure.search_vector, tsquery),
+            Brochure.is_deleted == False,
+            Brochure.status_filter("active")
+        )
+        if x_admin_branch:
+            try:
+                stmt = stmt.where(Brochure.branch_id == UUID(x_admin_branch))
+            except ValueError:
+                stmt = stmt.where(false())
+        sources.append(_rank_source("brochure", Brochure, stmt, tsquery, _brochure_result))
+
+    # Cursors only continue the same query and type
+    cursor_scope = f"{type}:{' '.join(terms)}"
+    async with read_session() as db:
+        try:
+            items, next_cursor = await merge_page(db, sources, cursor_scope, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return success_response(
+        data={"query": q, "items": items, "next_cursor": next_cursor},
+        message="Search results fetched successfully"
+    )
@@ -1,35 +1,47 @@
 from utils.utils_cta_status import generate_cta_link_service, calculate_service_status
 # Services router with pagination and response wrapper
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from datetime import datetime, time
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from sqlalchemy import false, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, read_session
 from models.db_service import ServiceDB
-from models.service_model import Service, ServiceCreate, ServiceUpdate
-from utils.logging_db_util import log_admin_action as log_db_action
+from models.service_model import Service, ServiceBulkAction, ServiceCreate, ServiceImport, ServiceUpdate
+from utils.logging_db_util import log_admin_action as log_db_action, log_admin_actions
 from utils.logging_debug_util import log_admin_action as log_debug_action
-from utils.role_check_util import check_role
+from utils.jwt_auth_util import AdminContext, admin_branch, require_roles
 from utils.response_wrapper import success_response, error_response
-from utils.pagination_util import apply_pagination
-from typing import List
+from utils.pagination_util import paginate_query
+from utils.auto_generate_util import generate_unique_code, generate_unique_slug
+from utils.response_cache_util import cached_json_response, response_cache
+from utils.marketing_cache_util import branch_cache_key, invalidate_branch_feed, marketing_feed_cache
+from utils.marketing_sync_util import sync_marketing_item, remove_marketing_item
+from utils.bulk_import_util import read_import_rows, validate_rows, import_rows, import_report
+from utils.bulk_update_util import bulk_conditions, bulk_update
+from utils.export_util import export_response
+from utils.fieldset_util import Field, FieldSet, column_field
+from utils.tag_util import TAG_MODES, cached_tag_facets, invalidate_tag_facets, parse_tags_param, tag_facet_query, tag_filter
 from urllib.parse import urlencode
 from typing import Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Bearer JWT (or legacy x-admin-token) with an editing role
+require_editor = require_roles("super_admin", "post_admin")
+
+# Columns clients may paginate by; id breaks ties so keyset cursors stay stable
+SERVICE_SORT_COLUMNS = {
+    "id": ServiceDB.id,
+    "created_at": ServiceDB.created_at
+}
 
 def generate_cta_link_service(service):
     if not service:
         return ""
     params = {
         "service_id": service.id,
-        "service_title": service.title_ar
+        "service_title": service.name
     }
     base_url = "https://yourclinic.com/booking"  # Placeholder
     return f"{base_url}?{urlencode(params, encoding='utf-8')}"
@@ -37,24 +49,29 @@ def generate_cta_link_service(service):
 def calculate_service_status(service):
     return "active" if service.is_active else "archived"
 
-def get_services(page: int = 1, limit: int = 20, db: Session = Depends(get_db)):
-    services = db.query(ServiceDB).filter(ServiceDB.is_active == True).all()
-    result = []
-    for s in services:
-        s_data = Service.from_orm(s).dict()
-        # Inject CTA link
-        s_data["cta_link"] = generate_cta_link_service(s)
-        # Inject Status
-        s_data["status"] = calculate_service_status(s)
-        result.append(s_data)
-    paginated = apply_pagination(result, page, limit)
-    return success_response(data=paginated, message="Services fetched successfully")
+# ?fields= whitelist; rows are built straight from the projected tuples (no ORM objects)
+SERVICE_FIELDS = FieldSet(
+    {
+        "id": column_field(ServiceDB.id),
+        "name": column_field(ServiceDB.name),
+        "description": column_field(ServiceDB.description),
+        "price": column_field(ServiceDB.price, lambda price: float(price) if price is not None else None),
+        "code": column_field(ServiceDB.code),
+        "slug": column_field(ServiceDB.slug),
+        "image_url": column_field(ServiceDB.image_url),
+        "branch_id": column_field(ServiceDB.branch_id),
+        "tags": column_field(ServiceDB.tags, lambda tags: tags or []),
+        "created_at": column_field(ServiceDB.created_at),
+        "cta_link": Field((ServiceDB.id, ServiceDB.name), generate_cta_link_service),
+        "status": Field((ServiceDB.is_active,), calculate_service_status),
+    },
+    # List view default: no description
+    default=("id", "name", "price", "code", "slug", "image_url", "branch_id", "tags", "cta_link", "status")
+)
 
 @router.post("/", response_model=Service)
-def create_service(service: ServiceCreate, request: Request, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
-    role = check_role(x_admin_token)
-    if role not in ["super_admin", "post_admin"]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
+async def create_service(service: ServiceCreate, request: Request, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    role = admin.role
 
     payload = service.dict()
     if "branch_id" not in payload:
@@ -64,24 +81,10 @@ def create_service(service: ServiceCreate, request: Request, x_admin_token: str
     if "tags" not in payload:
         payload["tags"] = []
 
-    # Auto-generate code if not supplied
-    if "code" not in payload or not payload["code"]:
-        now = datetime.utcnow()
-        prefix = now.strftime("%m%y") + "-SER-"
-        last = db.query(ServiceDB).filter(ServiceDB.code.like(f"{prefix}%")).order_by(ServiceDB.id.desc()).first()
-        last_num = int(last.code[-3:]) if last and last.code else 0
-        new_code = f"{prefix}{last_num + 1:03d}"
-        while db.query(ServiceDB).filter(ServiceDB.code == new_code).first():
-            last_num += 1
-            new_code = f"{prefix}{last_num + 1:03d}"
-        payload["code"] = new_code
-    else:
-        if db.query(ServiceDB).filter(ServiceDB.code == payload["code"]).first():
-            raise HTTPException(status_code=409, detail=f"Service code '{payload['code']}' already exists.")
+    if payload.get("code") and await db.scalar(select(ServiceDB.id).where(ServiceDB.code == payload["code"])):
+        raise HTTPException(status_code=409, detail=f"Service code '{payload['code']}' already exists.")
 
-    
-    role = check_role(x_admin_token)
-    admin_branch_id = int(request.headers.get("x-admin-branch", "0"))
+    admin_branch_id = admin_branch(admin, request.headers.get("x-admin-branch", "0"), int)
     if role in ["branch_admin", "post_admin"]:
         payload["branch_id"] = admin_branch_id
     elif role == "super_admin":
@@ -92,24 +95,52 @@ def create_service(service: ServiceCreate, request: Request, x_admin_token: str
         payload["tags"] = [f"auto", f"branch-{payload['branch_id']}"]
     payload["tags"] = list(dict.fromkeys([t.lower() for t in payload["tags"]]))  # deduplicate and normalize
 
-    db_service = ServiceDB(**payload)
-    db.add(db_service)
-    db.commit()
-    db.refresh(db_service)
-
-    admin_user = request.headers.get("x-admin-name", "unknown")
-    log_db_action(db, admin_user, role, "Create", "Service", db_service.id)
+    base_slug = payload.get("slug")
+    auto_code = not payload.get("code")
+    prefix = datetime.utcnow().strftime("%m%y") + "-SER"
+    # A concurrent create can take the same free slug between allocation and insert:
+    # allocate once more before answering 409
+    for attempt in range(2):
+        if base_slug:
+            payload["slug"] = await generate_unique_slug(base_slug, db, ServiceDB)
+        # Auto-generate code if not supplied; reserved right before the insert since the
+        # counter row stays locked until commit (a rollback returns it)
+        if auto_code:
+            payload["code"] = await generate_unique_code(prefix, db, ServiceDB)
+
+        db_service = ServiceDB(**payload)
+        db.add(db_service)
+        try:
+            await db.flush()
+            await sync_marketing_item(db, "service", db_service)
+            await db.commit()
+            break
+        except IntegrityError as e:
+            await db.rollback()
+            if "(slug)" in str(e):
+                if attempt == 0:
+                    continue
+                raise HTTPException(status_code=409, detail=f"Slug '{base_slug}' is being used by another request, please retry.")
+            if "(code)" in str(e):
+                # A concurrent create took the same hand-entered code
+                raise HTTPException(status_code=409, detail=f"Service code '{payload['code']}' already exists.")
+            raise
+    await db.refresh(db_service)
+    response_cache.invalidate("services")
+    invalidate_tag_facets("services")
+    invalidate_branch_feed(db_service.branch_id)
+
+    admin_user = admin.name
+    await log_db_action(admin_user, role, "Create", "Service", db_service.id)
     log_debug_action(admin_user, "Create", "Service", db_service.id)
 
     return success_response(data=Service.from_orm(db_service).dict(), message="Service created successfully")
 
 @router.put("/{service_id}", response_model=Service)
-def update_service(service_id: int, service: ServiceUpdate, request: Request, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
-    role = check_role(x_admin_token)
-    if role not in ["super_admin", "post_admin"]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
+async def update_service(service_id: int, service: ServiceUpdate, request: Request, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    role = admin.role
 
-    db_service = db.query(ServiceDB).filter(ServiceDB.id == service_id, ServiceDB.is_active == True).first()
+    db_service = await db.scalar(select(ServiceDB).where(ServiceDB.id == service_id, ServiceDB.is_active == True))
     if not db_service:
         return error_response(message="Service not found", code=404)
     updates = service.dict(exclude_unset=True)
@@ -119,60 +150,66 @@ def update_service(service_id: int, service: ServiceUpdate, request: Request, x_
         updates["code"] = db_service.code
     if "slug" not in updates:
         updates["slug"] = db_service.slug
+    elif updates["slug"] and updates["slug"] != db_service.slug:
+        updates["slug"] = await generate_unique_slug(updates["slug"], db, ServiceDB)
     if "tags" not in updates:
         updates["tags"] = db_service.tags or []
     for key, value in updates.items():
         setattr(db_service, key, value)
-    db.commit()
-    db.refresh(db_service)
-
-    admin_user = request.headers.get("x-admin-name", "unknown")
-    log_db_action(db, admin_user, role, "Update", "Service", db_service.id)
+    await sync_marketing_item(db, "service", db_service)
+    await db.commit()
+    await db.refresh(db_service)
+    response_cache.invalidate("services")
+    invalidate_tag_facets("services")
+    invalidate_branch_feed(db_service.branch_id)
+
+    admin_user = admin.name
+    await log_db_action(admin_user, role, "Update", "Service", db_service.id)
     log_debug_action(admin_user, "Update", "Service", db_service.id)
 
     return success_response(data=Service.from_orm(db_service).dict(), message="Service updated successfully")
 
 @router.delete("/{service_id}")
-def delete_service(service_id: int, request: Request, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
-    role = check_role(x_admin_token)
-    if role not in ["super_admin", "post_admin"]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
+async def delete_service(service_id: int, request: Request, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    role = admin.role
 
-    db_service = db.query(ServiceDB).filter(ServiceDB.id == service_id, ServiceDB.is_active == True).first()
+    db_service = await db.scalar(select(ServiceDB).where(ServiceDB.id == service_id, ServiceDB.is_active == True))
     if not db_service:
         return error_response(message="Service not found", code=404)
     db_service.is_active = False
-    db.commit()
-
-    admin_user = request.headers.get("x-admin-name", "unknown")
-    log_db_action(db, admin_user, role, "Archive", "Service", db_service.id)
+    await sync_marketing_item(db, "service", db_service)
+    await db.commit()
+    response_cache.invalidate("services")
+    invalidate_tag_facets("services")
+    invalidate_branch_feed(db_service.branch_id)
+
+    admin_user = admin.name
+    await log_db_action(admin_user, role, "Archive", "Service", db_service.id)
     log_debug_action(admin_user, "Archive", "Service", db_service.id)
 
     return success_response(message="Service archived successfully")
 
 @router.delete("/{service_id}/permanent")
-def hard_delete_service(service_id: int, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
-    role = check_role(x_admin_token)
-    if role != "super_admin":
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
-
-    service = db.query(ServiceDB).filter(ServiceDB.id == service_id).first()
+async def hard_delete_service(service_id: int, admin: AdminContext = Depends(require_roles("super_admin")), db: AsyncSession = Depends(get_db)):
+    service = await db.scalar(select(ServiceDB).where(ServiceDB.id == service_id))
     if not service:
         return error_response(message="Service not found", code=404)
 
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await remove_marketing_item(db, "service", service.id)
+    await db.commit()
+    response_cache.invalidate("services")
+    invalidate_tag_facets("services")
+    invalidate_branch_feed(service.branch_id)
 
     return success_response(message="Service permanently deleted")
 
 
 @router.post("/{service_id}/duplicate", response_model=Service)
-def duplicate_service(service_id: int, overrides: ServiceUpdate, request: Request, x_admin_token: str = Header(...), db: Session = Depends(get_db)):
-    role = check_role(x_admin_token)
-    if role not in ["super_admin", "post_admin"]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
+async def duplicate_service(service_id: int, overrides: ServiceUpdate, request: Request, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    role = admin.role
 
-    original = db.query(ServiceDB).filter(ServiceDB.id == service_id, ServiceDB.is_active == True).first()
+    original = await db.scalar(select(ServiceDB).where(ServiceDB.id == service_id, ServiceDB.is_active == True))
     if not original:
         return error_response(message="Original service not found", code=404)
 
@@ -188,38 +225,205 @@ def duplicate_service(service_id: int, overrides: ServiceUpdate, request: Reques
 
     duplicated = ServiceDB(**combined_data)
     db.add(duplicated)
-    db.commit()
-    db.refresh(duplicated)
-
-    admin_user = request.headers.get("x-admin-name", "unknown")
-    log_db_action(db, admin_user, role, "Duplicate", "Service", duplicated.id)
+    await db.flush()
+    await sync_marketing_item(db, "service", duplicated)
+    await db.commit()
+    await db.refresh(duplicated)
+    response_cache.invalidate("services")
+    invalidate_tag_facets("services")
+    invalidate_branch_feed(duplicated.branch_id)
+
+    admin_user = admin.name
+    await log_db_action(admin_user, role, "Duplicate", "Service", duplicated.id)
     log_debug_action(admin_user, "Duplicate", "Service", duplicated.id)
 
     return success_response(data=Service.from_orm(duplicated).dict(), message="Service duplicated successfully")
 
+@router.post("/import")
+async def import_services(request: Request, file: UploadFile = File(...), format: Optional[str] = None, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    """
+    Bulk create from CSV (header row) or NDJSON. Rows are validated up front, codes and
+    slugs allocated per chunk in bulk and inserted in chunked transactions; the response
+    lists created ids and a per-row error report.
+    """
+    role = admin.role
+
+    rows, parse_errors = await read_import_rows(file, format)
+    valid, validation_errors = validate_rows(rows, ServiceImport)
+    admin_branch_id = admin_branch(admin, request.headers.get("x-admin-branch", "0"), int)
+
+    def prepare(values):
+        # Same branch and tag rules as create_service
+        if role in ["branch_admin", "post_admin"]:
+            values["branch_id"] = admin_branch_id
+        elif not values.get("branch_id"):
+            values["branch_id"] = 1  # fallback default
+        if not values.get("tags"):
+            values["tags"] = ["auto", f"branch-{values['branch_id']}"]
+        values["tags"] = list(dict.fromkeys([t.lower() for t in values["tags"]]))
+
+    prefix = datetime.utcnow().strftime("%m%y") + "-SER"
+    created, insert_errors = await import_rows(db, ServiceDB, "service", valid, prefix, prepare)
+    if created:
+        response_cache.invalidate("services")
+        invalidate_tag_facets("services")
+        invalidate_branch_feed(*[service.branch_id for _, service in created])
+
+    admin_user = admin.name
+    await log_admin_actions(admin_user, role, "Import", "Service", [service.id for _, service in created])
+    log_debug_action(admin_user, "Import", "Service", f"{len(created)} rows")
+
+    report = import_report(len(rows) + len(parse_errors), created, parse_errors + validation_errors + insert_errors)
+    return success_response(data=report, message=f"Imported {report['created']} of {report['received']} services")
+
+@router.post("/bulk")
+async def bulk_services(bulk: ServiceBulkAction, request: Request, admin: AdminContext = Depends(require_editor), db: AsyncSession = Depends(get_db)):
+    """
+    Update / archive / restore every service matching ids and/or filter
+    (branch_id, tag, created_from..created_to) with one UPDATE statement.
+    """
+    role = admin.role
+
+    filters = []
+    if bulk.filter:
+        if bulk.filter.branch_id:
+            filters.append(ServiceDB.branch_id == bulk.filter.branch_id)
+        if bulk.filter.tag:
+            filters.append(ServiceDB.tags.contains([bulk.filter.tag.lower()]))
+        if bulk.filter.created_from:
+            filters.append(ServiceDB.created_at >= datetime.combine(bulk.filter.created_from, time.min))
+        if bulk.filter.created_to:
+            filters.append(ServiceDB.created_at <= datetime.combine(bulk.filter.created_to, time.max))
+    conditions = bulk_conditions(ServiceDB, bulk.ids, filters)
+    # Everyone but super admins is clamped to their own branch, whatever the filter says
+    if role != "super_admin":
+        conditions.append(ServiceDB.branch_id == admin_branch(admin, request.headers.get("x-admin-branch", "0"), int))
+
+    # Same row scope as the single-item endpoints: edit/archive active ones, restore archived ones
+    if bulk.action == "update":
+        values = bulk.patch.model_dump(exclude_unset=True) if bulk.patch else {}
+        if not values:
+            raise HTTPException(status_code=400, detail="patch is required for update")
+        if "branch_id" in values and role != "super_admin":
+            raise HTTPException(status_code=403, detail="Only super admins can move services between branches")
+        if values.get("tags") is not None:
+            values["tags"] = list(dict.fromkeys([t.lower() for t in values["tags"]]))
+        conditions.append(ServiceDB.is_active == True)
+    elif bulk.action == "archive":
+        values = {"is_active": False}
+        conditions.append(ServiceDB.is_active == True)
+    else:
+        values = {"is_active": True}
+        conditions.append(ServiceDB.is_active == False)
+
+    updated = await bulk_update(db, ServiceDB, "service", conditions, values)
+    if updated:
+        response_cache.invalidate("services")
+        invalidate_tag_facets("services")
+        if "branch_id" in values:
+            # Rows moved away from branches we no longer know
+            marketing_feed_cache.clear()
+        else:
+            invalidate_branch_feed(*[service.branch_id for service in updated])
+
+    action = f"Bulk{bulk.action.capitalize()}"
+    admin_user = admin.name
+    await log_admin_actions(admin_user, role, action, "Service", [service.id for service in updated])
+    log_debug_action(admin_user, action, "Service", f"{len(updated)} rows")
+
+    return success_response(
+        data={"action": bulk.action, "affected": len(updated), "ids": [service.id for service in updated]},
+        message=f"{len(updated)} services affected"
+    )
+
+# Exported columns; same names the bulk import reads back
+SERVICE_EXPORT_COLUMNS = (
+    ServiceDB.id, ServiceDB.code, ServiceDB.slug, ServiceDB.name, ServiceDB.description,
+    ServiceDB.price, ServiceDB.branch_id, ServiceDB.image_url, ServiceDB.is_active,
+    ServiceDB.tags, ServiceDB.created_at
+)
+
+@router.get("/export")
+async def export_services(format: str = "csv", branch_id: Optional[int] = None, status: Optional[str] = None, admin: AdminContext = Depends(require_roles())):
+    """Stream every matching service as CSV or NDJSON through a server-side cursor"""
+
+    stmt = select(*SERVICE_EXPORT_COLUMNS)
+    # Bearer callers scoped to a branch only export that branch
+    scope = admin_branch(admin, None, int)
+    if scope is not None:
+        stmt = stmt.where(ServiceDB.branch_id == scope)
+    if branch_id:
+        stmt = stmt.where(ServiceDB.branch_id == branch_id)
+    if status == "active":
+        stmt = stmt.where(ServiceDB.is_active == True)
+    elif status == "archived":
+        stmt = stmt.where(ServiceDB.is_active == False)
+    elif status:
+        raise HTTPException(status_code=400, detail="status must be one of ['active', 'archived']")
+    return export_response(stmt.order_by(ServiceDB.id), format, "services")
+
 
-# TODO: Migrate role-checking to JWT/OAuth in future versions.
 # TODO: Implement multilingual responses in future versions.
 
-@router.get("/", response_model=List[Service])
-def get_services(
-    page: int = 1,
-    limit: int = 20,
+@router.get("/")
+async def get_services(
+    request: Request,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
     branch_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    order_by: str = "id",
+    tags: Optional[str] = None,
+    tags_mode: str = "any",
+    fields: Optional[str] = None
 ):
-    query = db.query(ServiceDB)
+    sort_column = SERVICE_SORT_COLUMNS.get(order_by)
+    if sort_column is None:
+        raise HTTPException(status_code=400, detail=f"order_by must be one of {list(SERVICE_SORT_COLUMNS)}")
+    if tags_mode not in TAG_MODES:
+        raise HTTPException(status_code=400, detail=f"tags_mode must be one of {list(TAG_MODES)}")
+
+    # ?fields=id,name,image_url,cta_link narrows both the SELECT list and each item
+    field_names = SERVICE_FIELDS.parse(fields)
+    stmt = select(*SERVICE_FIELDS.columns(field_names, sort_column, ServiceDB.id))
     if branch_id:
-        query = query.filter(ServiceDB.branch_id == branch_id)
-    services = query.all()
-    result = []
-    for s in services:
-        s_data = Service.from_orm(s).dict()
-        s_data["cta_link"] = generate_cta_link_service(s)
-        s_data["status"] = calculate_service_status(s)
-        if status and s_data["status"] != status:
-            continue
-        result.append(s_data)
-    paginated = apply_pagination(result, page, limit)
-    return success_response(data=paginated, message="Services fetched successfully")
\ No newline at end of file
+        stmt = stmt.where(ServiceDB.branch_id == branch_id)
+    # Status is derived from is_active (see calculate_service_status), so filter in SQL
+    if status == "active":
+        stmt = stmt.where(ServiceDB.is_active == True)
+    elif status == "archived":
+        stmt = stmt.where(ServiceDB.is_active == False)
+    elif status:
+        stmt = stmt.where(false())
+    # ?tags=a,b -> any (overlap) or all (contains), served by the GIN index on tags
+    tag_list = parse_tags_param(tags)
+    if tag_list:
+        stmt = stmt.where(tag_filter(ServiceDB.tags, tag_list, tags_mode))
+
+    async def build():
+        async with read_session() as db:
+            try:
+                paginated = await paginate_query(db, stmt, sort_column, ServiceDB.id, page=page, limit=limit, cursor=cursor, as_rows=True)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        paginated["items"] = [SERVICE_FIELDS.item(row, field_names) for row in paginated["items"]]
+        return success_response(data=paginated, message="Services fetched successfully")
+
+    # Database is only touched on a cache miss; unchanged lists revalidate with 304
+    return await cached_json_response(request, "services", build)
+
+@router.get("/tags")
+async def get_service_tag_facets(branch_id: Optional[int] = None):
+    """Per-tag counts of active services (optionally for one branch), cached until the next service write"""
+    async def load():
+        conditions = [ServiceDB.is_active == True]
+        if branch_id:
+            conditions.append(ServiceDB.branch_id == branch_id)
+        async with read_session() as db:
+            rows = (await db.execute(tag_facet_query(ServiceDB, *conditions))).all()
+        return [{"tag": tag, "count": count} for tag, count in rows]
+
+    facets = await cached_tag_facets("services", branch_cache_key(branch_id), load)
+    return success_response(data=facets, message="Service tags fetched successfully")
@@ -1,11 +1,34 @@
 # setup_db.py
 
-from database import engine, Base
+import sys
+from sqlalchemy import select
+from database import engine, Base, SessionLocal
+from utils.marketing_sync_util import rebuild_marketing_items
+from utils.upload_util import prune_unreferenced_images
+from models.db_brochure import Brochure
 
 def initialize_database():
     print("Creating all tables...")
     Base.metadata.create_all(bind=engine)
     print("✅ Tables created successfully.")
 
+def refresh_marketing_items():
+    print("Rebuilding marketing_items read model...")
+    with SessionLocal() as db:
+        total = rebuild_marketing_items(db)
+        db.commit()
+    print(f"✅ marketing_items rebuilt ({total} rows).")
+
+def prune_brochure_images():
+    print("Pruning unreferenced brochure images...")
+    with SessionLocal() as db:
+        referenced = set(db.scalars(select(Brochure.image_hash).where(Brochure.image_hash.isnot(None)).distinct()))
+    removed = prune_unreferenced_images("static/brochures", referenced)
+    print(f"✅ {removed} unreferenced image files removed.")
+
 if __name__ == "__main__":
     initialize_database()
+    if "--rebuild-marketing-items" in sys.argv:
+        refresh_marketing_items()
+    if "--prune-images" in sys.argv:
+        prune_brochure_images()
@@ -1,15 +1,116 @@
-def generate_unique_slug(base_slug, db, model):
-    slug = base_slug
-    suffix = 1
-    while db.query(model).filter(model.slug == slug).first():
-        slug = f"{base_slug}-{suffix}"
-        suffix += 1
-    return slug
-
-def generate_unique_code(prefix, db, model):
-    suffix = 1
-    code = f"{prefix}-{suffix:03d}"
-    while db.query(model).filter(model.code == code).first():
-        suffix += 1
-        code = f"{prefix}-{suffix:03d}"
-    return code
\ No newline at end of file
+import re
+from sqlalchemy import Integer, cast, func, literal, literal_column, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from models.db_code_counter import CodeCounter
+
+# Slugs "<base>-<n>" belong to the family of <base>; both tables index this expression
+SLUG_SUFFIX_PATTERN = r"-(\d+)$"
+
+def slug_family(slug_column):
+    # Literal (not bound) arguments so the expression matches the index definition
+    return func.regexp_replace(slug_column, literal_column(r"'-\d+$'"), literal_column("''"))
+
+async def allocate_unique_slugs(base_slugs, db, model):
+    """
+    Free slugs for a batch of base slugs, in input order, with one query.
+    A base is kept as-is when unused, otherwise it gets the next suffix above
+    the highest one in use; slugs handed out earlier in the same batch are
+    reserved too, so bulk imports never collide with themselves.
+    """
+    bases = list(dict.fromkeys(base_slugs))
+    if not bases:
+        return []
+    # suffix -1 marks "this exact base is taken"
+    exact = select(model.slug.label("base"), literal(-1).label("suffix")).where(model.slug.in_(bases))
+    suffixed = (
+        select(
+            slug_family(model.slug).label("base"),
+            func.max(cast(func.substring(model.slug, SLUG_SUFFIX_PATTERN), Integer)).label("suffix")
+        )
+        .where(slug_family(model.slug).in_(bases), model.slug.regexp_match(SLUG_SUFFIX_PATTERN))
+        .group_by(slug_family(model.slug))
+    )
+    taken = set()
+    highest = {}
+    for base, suffix in (await db.execute(union_all(exact, suffixed))).all():
+        if suffix == -1:
+            taken.add(base)
+        else:
+            highest[base] = max(highest.get(base, 0), suffix)
+
+    allocated = []
+    used = set()
+    for base in base_slugs:
+        slug = base
+        if base in taken or base in used:
+            number = highest.get(base, 0) + 1
+            slug = f"{base}-{number}"
+            while slug in used:
+                number += 1
+                slug = f"{base}-{number}"
+            highest[base] = number
+        used.add(slug)
+        allocated.append(slug)
+    return allocated
+
+async def generate_unique_slug(base_slug, db, model):
+    return (await allocate_unique_slugs([base_slug], db, model))[0]
+
+def _code_pattern(prefix):
+    return "^" + re.escape(prefix) + r"-(\d+)$"
+
+async def _highest_existing_suffix(prefix, db, model):
+    # Runs the first time a prefix is seen (codes made before the counter existed)
+    # and when a reserved block clashes with hand-entered codes
+    pattern = _code_pattern(prefix)
+    highest = await db.scalar(
+        select(func.max(cast(func.substring(model.code, pattern), Integer)))
+        .where(model.code.like(f"{prefix}-%"))
+    )
+    return highest or 0
+
+def _code_block(prefix, last, count):
+    return [f"{prefix}-{number:03d}" for number in range(last - count + 1, last + 1)]
+
+async def reserve_code_block(prefix, db, model, count=1, taken=()):
+    """
+    Allocate count consecutive codes "<prefix>-NNN" with one atomic counter update.
+    The counter row stays locked until the caller commits, so concurrent
+    creators never receive the same number; a rollback returns the block.
+    Codes supplied by hand (in the table, or in taken for rows not inserted yet)
+    can sit above the counter: on a clash the counter jumps past the highest one.
+    """
+    last = (await db.execute(
+        update(CodeCounter)
+        .where(CodeCounter.prefix == prefix)
+        .values(last_value=CodeCounter.last_value + count)
+        .returning(CodeCounter.last_value)
+    )).scalar()
+    if last is None:
+        seed = await _highest_existing_suffix(prefix, db, model)
+        stmt = insert(CodeCounter).values(prefix=prefix, last_value=seed + count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CodeCounter.prefix],
+            set_={"last_value": CodeCounter.last_value + count}
+        ).returning(CodeCounter.last_value)
+        last = (await db.execute(stmt)).scalar()
+    codes = _code_block(prefix, last, count)
+
+    taken = set(taken)
+    if taken.intersection(codes) or await db.scalar(select(model.code).where(model.code.in_(codes)).limit(1)):
+        pattern = re.compile(_code_pattern(prefix))
+        highest = max(
+            [await _highest_existing_suffix(prefix, db, model)]
+            + [int(match.group(1)) for match in map(pattern.match, taken) if match]
+        )
+        last = (await db.execute(
+            update(CodeCounter)
+            .where(CodeCounter.prefix == prefix)
+            .values(last_value=func.greatest(CodeCounter.last_value, highest) + count)
+            .returning(CodeCounter.last_value)
+        )).scalar()
+        codes = _code_block(prefix, last, count)
+    return codes
+
+async def generate_unique_code(prefix, db, model):
+    return (await reserve_code_block(prefix, db, model))[0]
@@ -0,0 +1,178 @@
+# Bulk catalog import: CSV/NDJSON parsing, batch validation, bulk code/slug allocation
+# and chunked multi-row inserts with a per-row error report
+import csv
+import io
+import json
+import logging
+import os
+from collections import namedtuple
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from utils.auto_generate_util import allocate_unique_slugs, reserve_code_block
+from utils.marketing_sync_util import sync_marketing_items
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+MAX_IMPORT_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "10000"))
+MAX_IMPORT_BYTES = int(float(os.getenv("BULK_IMPORT_MAX_MB", "20")) * 1024 * 1024)
+IMPORT_READ_CHUNK = 64 * 1024
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Plain values captured once a chunk commits; a later chunk's rollback expires the
+# ORM rows, and touching them again would lazy-load on the AsyncSession
+ImportedRow = namedtuple("ImportedRow", ["id", "code", "slug", "branch_id"])
+
+def detect_import_format(upload: UploadFile, fmt: str = None):
+    if fmt:
+        if fmt not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {list(IMPORT_FORMATS)}")
+        return fmt
+    name = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise HTTPException(status_code=400, detail="Cannot tell the file format; pass format=csv or format=ndjson")
+
+async def _read_text(upload: UploadFile):
+    data = bytearray()
+    while chunk := await upload.read(IMPORT_READ_CHUNK):
+        data.extend(chunk)
+        if len(data) > MAX_IMPORT_BYTES:
+            raise HTTPException(status_code=413, detail=f"Import file exceeds {MAX_IMPORT_BYTES // (1024 * 1024)} MB limit")
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8")
+
+async def read_import_rows(upload: UploadFile, fmt: str = None):
+    """
+    Parse an uploaded CSV (header row) or NDJSON file into ([(row_number, dict)], errors).
+    Row numbers are file line numbers; empty CSV cells are dropped so model defaults apply.
+    """
+    fmt = detect_import_format(upload, fmt)
+    text = await _read_text(upload)
+    rows, errors = [], []
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            values = {
+                key.strip(): value.strip()
+                for key, value in record.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+            if values:
+                rows.append((reader.line_num, values))
+    else:
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append({"row": line_number, "error": f"Invalid JSON: {e.msg}"})
+                continue
+            if not isinstance(values, dict):
+                errors.append({"row": line_number, "error": "Each line must be a JSON object"})
+                continue
+            rows.append((line_number, values))
+
+    if len(rows) + len(errors) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"Import is limited to {MAX_IMPORT_ROWS} rows")
+    if not rows and not errors:
+        raise HTTPException(status_code=400, detail="Import file has no rows")
+    return rows, errors
+
+def _format_validation_error(error: ValidationError):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def validate_rows(rows, schema):
+    """Validate every row against a pydantic schema; returns ([(row_number, dict)], errors)"""
+    valid, errors = [], []
+    for row_number, values in rows:
+        try:
+            valid.append((row_number, schema.model_validate(values).model_dump()))
+        except ValidationError as e:
+            errors.append({"row": row_number, "error": _format_validation_error(e)})
+    return valid, errors
+
+def _reject_duplicate_codes(chunk, errors, seen_codes, existing_codes):
+    kept = []
+    for row_number, values in chunk:
+        code = values.get("code")
+        if code and code in existing_codes:
+            errors.append({"row": row_number, "error": f"Code '{code}' already exists"})
+        elif code and code in seen_codes:
+            errors.append({"row": row_number, "error": f"Code '{code}' appears more than once in the file"})
+        else:
+            if code:
+                seen_codes.add(code)
+            kept.append((row_number, values))
+    return kept
+
+async def import_rows(db, model, item_type, rows, code_prefix, prepare=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Insert validated rows in chunks, one transaction per chunk, so a bad chunk only
+    costs its own rows. Per chunk: one query for clashing codes, one counter update
+    for the missing codes, one query for slugs, one multi-row INSERT ... RETURNING
+    and one read-model upsert. prepare(values) fills derived columns once code/slug are known.
+    Returns (created [(row_number, ImportedRow)], errors).
+    """
+    created, errors = [], []
+    seen_codes = set()
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        row_numbers = [row_number for row_number, _ in chunk]
+        try:
+            supplied = [values["code"] for _, values in chunk if values.get("code")]
+            existing = set((await db.scalars(select(model.code).where(model.code.in_(supplied)))).all()) if supplied else set()
+            chunk = _reject_duplicate_codes(chunk, errors, seen_codes, existing)
+            if not chunk:
+                continue
+            row_numbers = [row_number for row_number, _ in chunk]
+
+            missing = [values for _, values in chunk if not values.get("code")]
+            if missing:
+                for values, code in zip(missing, await reserve_code_block(code_prefix, db, model, len(missing), taken=seen_codes)):
+                    values["code"] = code
+            with_slug = [values for _, values in chunk if values.get("slug")]
+            if with_slug:
+                slugs = await allocate_unique_slugs([values["slug"] for values in with_slug], db, model)
+                for values, slug in zip(with_slug, slugs):
+                    values["slug"] = slug
+            if prepare:
+                for _, values in chunk:
+                    prepare(values)
+
+            # Rows come back in parameter order so they line up with row_numbers
+            inserted = (await db.scalars(
+                insert(model).returning(model, sort_by_parameter_order=True),
+                [values for _, values in chunk]
+            )).all()
+            await sync_marketing_items(db, item_type, inserted)
+            imported = [ImportedRow(row.id, row.code, row.slug, row.branch_id) for row in inserted]
+            await db.commit()
+            created.extend(zip(row_numbers, imported))
+        except SQLAlchemyError as e:
+            await db.rollback()
+            reason = str(getattr(e, "orig", e)).splitlines()[0]
+            logger.error(f"Bulk import chunk of {len(row_numbers)} {item_type} rows rolled back: {reason}")
+            errors.extend({"row": row_number, "error": f"Insert failed: {reason}"} for row_number in row_numbers)
+    return created, errors
+
+def import_report(received, created, errors):
+    return {
+        "received": received,
+        "created": len(created),
+        "failed": len(errors),
+        "items": [{"row": row_number, "id": row.id, "code": row.code, "slug": row.slug} for row_number, row in created],
+        "errors": sorted(errors, key=lambda error: error["row"])
+    }
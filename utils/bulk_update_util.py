@@ -0,0 +1,32 @@
+# Set-based bulk edits: one UPDATE ... WHERE ... RETURNING instead of load/mutate/commit per row
+from fastapi import HTTPException
+from sqlalchemy import update
+from utils.marketing_sync_util import sync_marketing_items
+
+def bulk_conditions(model, ids, filters):
+    """ids and/or filter conditions; refuses an empty selection so nothing updates the whole table"""
+    conditions = list(filters)
+    if ids:
+        conditions.append(model.id.in_(ids))
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Pass ids or at least one filter")
+    return conditions
+
+async def bulk_update(db, model, item_type, conditions, values):
+    """
+    Apply values to every matching row with a single UPDATE ... RETURNING, refresh
+    the marketing read model from the returned rows and commit once.
+    Returns the updated rows.
+    """
+    stmt = (
+        update(model)
+        .where(*conditions)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    )
+    rows = (await db.scalars(stmt)).all()
+    if rows:
+        await sync_marketing_items(db, item_type, rows)
+    await db.commit()
+    return rows
@@ -0,0 +1,175 @@
+# Connection pool configuration and live metrics
+import os
+import time
+from collections import deque
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+def pool_settings_from_env(prefix="DB"):
+    """
+    Engine keyword arguments built from environment variables:
+    {prefix}_POOL_SIZE, {prefix}_MAX_OVERFLOW, {prefix}_POOL_TIMEOUT, {prefix}_POOL_RECYCLE,
+    {prefix}_POOL_PRE_PING and {prefix}_POOL_PROFILE ("default" or "pgbouncer").
+    """
+    profile = os.getenv(f"{prefix}_POOL_PROFILE", "default").lower()
+    if profile == "pgbouncer":
+        # PgBouncer in transaction mode owns the pooling and cannot keep
+        # prepared statements across transactions
+        return profile, {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+    return profile, {
+        "pool_size": _env_int(f"{prefix}_POOL_SIZE", 5),
+        "max_overflow": _env_int(f"{prefix}_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int(f"{prefix}_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int(f"{prefix}_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool(f"{prefix}_POOL_PRE_PING", True),
+    }
+
+class PoolStats:
+    """Counters fed by pool events plus checkout latency timed around the pool's connect()"""
+
+    def __init__(self, name, profile, window=1000):
+        self.name = name
+        self.profile = profile
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.checkout_errors = 0
+        self.max_wait_ms = 0.0
+        self._recent_waits = deque(maxlen=window)
+
+    def attach(self, sync_engine):
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        self._pool = sync_engine.pool
+        self._time_checkouts(sync_engine.pool)
+
+    def _time_checkouts(self, pool):
+        # Pool events fire once a connection is handed out; wrapping connect() also
+        # covers the time spent queueing for one, measured only when a session really needs it
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                connection = connect()
+            except Exception:
+                self.record_error()
+                raise
+            self.record_wait(time.perf_counter() - started)
+            return connection
+
+        pool.connect = timed_connect
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checked_out = max(self.checked_out - 1, 0)
+
+    def record_wait(self, seconds):
+        wait_ms = seconds * 1000
+        self._recent_waits.append(wait_ms)
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_error(self):
+        self.checkout_errors += 1
+
+    def snapshot(self):
+        waits = sorted(self._recent_waits)
+
+        def percentile(p):
+            if not waits:
+                return None
+            return round(waits[min(int(len(waits) * p), len(waits) - 1)], 3)
+
+        pool = self._pool
+        return {
+            "name": self.name,
+            "profile": self.profile,
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "in_use": self.checked_out,
+            "idle": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "connections_opened": self.connections_opened,
+            "checkouts": self.checkouts,
+            "checkout_errors": self.checkout_errors,
+            "checkout_wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(self.max_wait_ms, 3),
+                "samples": len(waits)
+            }
+        }
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() IS NULL OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class ReplicaHealth:
+    """
+    Decides whether reads may go to the replica.
+    Lag is sampled at most once per check_interval; an error or excessive lag
+    sends reads to the primary until the next check.
+    """
+
+    def __init__(self, max_lag_seconds=5.0, check_interval=10.0):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.healthy = True
+        self.last_lag_seconds = None
+        self.last_error = None
+        self.fallbacks = 0
+        self._checked_at = 0.0
+
+    def needs_check(self):
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def available(self):
+        return self.healthy or self.needs_check()
+
+    def record_lag(self, lag_seconds):
+        self._checked_at = time.monotonic()
+        self.last_lag_seconds = float(lag_seconds)
+        self.healthy = self.last_lag_seconds <= self.max_lag_seconds
+        if self.healthy:
+            self.last_error = None
+
+    def record_failure(self, error):
+        self._checked_at = time.monotonic()
+        self.healthy = False
+        self.last_error = str(error)
+
+    def record_fallback(self):
+        self.fallbacks += 1
+
+    def snapshot(self):
+        return {
+            "healthy": self.healthy,
+            "last_lag_seconds": self.last_lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_error": self.last_error,
+            "fallbacks": self.fallbacks
+        }
@@ -0,0 +1,78 @@
+# Streaming CSV/NDJSON exports over a server-side cursor: memory stays at one batch of rows
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from database import read_session
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        # Same comma-separated form the bulk import accepts
+        return ",".join(str(item) for item in value)
+    return value
+
+async def _partitions(stmt, batch_size):
+    # The generator owns its session: request dependencies are closed before streaming starts
+    async with read_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+async def _csv_chunks(stmt, names, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    # Header goes out before the query runs, so the client sees the first byte at once
+    yield buffer.getvalue()
+    async for rows in _partitions(stmt, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+async def _ndjson_chunks(stmt, names, batch_size):
+    async for rows in _partitions(stmt, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+def export_response(stmt, fmt: str, filename: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Stream the rows of a column-projected select as CSV (header row) or NDJSON.
+    Column labels of stmt become the CSV header / JSON keys.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_MEDIA_TYPES)}")
+    names = list(stmt.selected_columns.keys())
+    chunks = _csv_chunks(stmt, names, batch_size) if fmt == "csv" else _ndjson_chunks(stmt, names, batch_size)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
@@ -0,0 +1,91 @@
+# Sorted, paginated k-way merge over several ordered SQL sources
+import heapq
+from utils.pagination_util import encode_token, decode_token, dump_cursor_value, load_cursor_value, keyset_after, keyset_order
+
+class MergeSource:
+    """
+    One ordered input to the merge.
+    stmt selects the entity; rows are read in (sort_expr, id_column) order after
+    the last position taken from this source. merge_key maps (entity, sort_value)
+    to the key shared by all sources (e.g. a datetime reduced to a date; NULL sort
+    values come last in SQL, so map them to a maximal key), and to_item builds the
+    response dict.
+    """
+
+    def __init__(self, name, stmt, sort_expr, id_column, merge_key, to_item):
+        self.name = name
+        self.stmt = stmt
+        self.sort_expr = sort_expr
+        self.id_column = id_column
+        self.merge_key = merge_key
+        self.to_item = to_item
+
+    async def rows(self, db, position, chunk_size):
+        # Lazily pages through the source; each query reads at most chunk_size rows
+        while True:
+            stmt = self.stmt.add_columns(self.sort_expr.label("sort_value"))
+            if position is not None:
+                stmt = stmt.where(keyset_after(self.sort_expr, self.id_column, *position))
+            stmt = stmt.order_by(*keyset_order(self.sort_expr, self.id_column)).limit(chunk_size)
+            chunk = (await db.execute(stmt)).all()
+            for entity, sort_value in chunk:
+                yield entity, sort_value
+            if len(chunk) < chunk_size:
+                return
+            last_entity, last_value = chunk[-1]
+            position = (last_value, getattr(last_entity, self.id_column.key))
+
+def encode_merge_cursor(sort, positions):
+    return encode_token({
+        "s": sort,
+        "p": {name: [dump_cursor_value(value), row_id] for name, (value, row_id) in positions.items()}
+    })
+
+def decode_merge_cursor(cursor, sort):
+    """Per-source positions from a merge cursor; raises ValueError if it is malformed or for another sort"""
+    payload = decode_token(cursor)
+    try:
+        if payload["s"] != sort:
+            raise ValueError(f"Cursor was issued for sort={payload['s']}")
+        return {name: (load_cursor_value(value), int(row_id)) for name, (value, row_id) in payload["p"].items()}
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+async def merge_page(db, sources, sort, limit, cursor=None):
+    """
+    Return (items, next_cursor) for one page of the merged feed.
+    Each source contributes at most limit + 1 rows per page, so the cost of a page
+    depends on the page size and number of sources, never on the total content.
+    The cursor records the last position taken from every source.
+    """
+    positions = decode_merge_cursor(cursor, sort) if cursor else {}
+    streams = [source.rows(db, positions.get(source.name), limit + 1) for source in sources]
+    heap = []
+    sequence = 0
+
+    async def push(index):
+        nonlocal sequence
+        row = await anext(streams[index], None)
+        if row is not None:
+            entity, sort_value = row
+            # sequence keeps each source's own order on ties and avoids comparing entities
+            heapq.heappush(heap, (sources[index].merge_key(entity, sort_value), index, sequence, entity, sort_value))
+            sequence += 1
+
+    try:
+        for index in range(len(sources)):
+            await push(index)
+
+        items = []
+        while heap and len(items) < limit:
+            _, index, _, entity, sort_value = heapq.heappop(heap)
+            source = sources[index]
+            items.append(source.to_item(entity))
+            positions[source.name] = (sort_value, getattr(entity, source.id_column.key))
+            await push(index)
+
+        next_cursor = encode_merge_cursor(sort, positions) if heap else None
+        return items, next_cursor
+    finally:
+        for stream in streams:
+            await stream.aclose()
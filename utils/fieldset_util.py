@@ -0,0 +1,45 @@
+# Sparse fieldsets: ?fields=a,b limits both the SELECT list and the serialized item
+from fastapi import HTTPException
+
+class Field:
+    """A response field: the SQL columns it needs and how to read its value from a row"""
+
+    def __init__(self, columns, getter):
+        self.columns = tuple(columns)
+        self.getter = getter
+
+def column_field(column, convert=None):
+    key = column.key
+    if convert is None:
+        return Field((column,), lambda row: getattr(row, key))
+    return Field((column,), lambda row: convert(getattr(row, key)))
+
+class FieldSet:
+    """
+    Per-model whitelist of list fields. parse() validates ?fields= against it,
+    columns() gives the projection for the chosen fields (plus any columns the
+    query itself needs, e.g. keyset sort keys) and item() builds the dict.
+    """
+
+    def __init__(self, fields, default, always=("id",)):
+        self.fields = fields
+        self.default = tuple(default)
+        self.always = tuple(always)
+
+    def parse(self, fields_param):
+        if not fields_param:
+            return self.default
+        requested = [name.strip() for name in fields_param.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields {unknown}; allowed: {sorted(self.fields)}")
+        return tuple(dict.fromkeys(list(self.always) + requested))
+
+    def columns(self, names, *extra):
+        selected = {}
+        for column in [column for name in names for column in self.fields[name].columns] + list(extra):
+            selected.setdefault(column.key, column)
+        return list(selected.values())
+
+    def item(self, row, names):
+        return {name: self.fields[name].getter(row) for name in names}
@@ -0,0 +1,81 @@
+# Resized JPEG/WebP variants and a blur placeholder, rendered in a bounded process pool.
+# Kept free of app/database imports: worker processes import this module on their own.
+import asyncio
+import base64
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+VARIANT_WIDTHS = {"thumb": 320, "card": 800, "full": 1600}
+PLACEHOLDER_WIDTH = 16
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", "32"))
+
+_pool = None
+_pending = None
+
+def render_derivatives(src_path, out_dir, stem):
+    """
+    Runs in a worker process. Writes <stem>_<variant>.jpg/.webp next to each other
+    and returns ({variant: {width, height, jpg, webp}}, placeholder data URI).
+    Images are never upscaled.
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(src_path) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    for name, width in VARIANT_WIDTHS.items():
+        resized = image.copy()
+        if resized.width > width:
+            resized.thumbnail((width, resized.height), Image.LANCZOS)
+        jpg_name = f"{stem}_{name}.jpg"
+        webp_name = f"{stem}_{name}.webp"
+        resized.save(os.path.join(out_dir, jpg_name), "JPEG", quality=82, optimize=True, progressive=True)
+        resized.save(os.path.join(out_dir, webp_name), "WEBP", quality=80, method=4)
+        variants[name] = {"width": resized.width, "height": resized.height, "jpg": jpg_name, "webp": webp_name}
+
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH), Image.LANCZOS)
+    buffer = BytesIO()
+    tiny.save(buffer, "WEBP", quality=40)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+    return variants, placeholder
+
+def _get_pool():
+    global _pool, _pending
+    if _pool is None:
+        # spawn: workers start clean instead of forking the running event loop
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    if _pending is None:
+        _pending = asyncio.Semaphore(IMAGE_MAX_PENDING)
+    return _pool, _pending
+
+def _discard_pool(pool):
+    # A dead worker (OOM, crash on a malformed image) breaks the whole executor;
+    # drop it so the next job starts a fresh one
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+async def build_derivatives(src_path, out_dir, stem):
+    """Render off the event loop; at most IMAGE_MAX_PENDING jobs are queued at once"""
+    pool, pending = _get_pool()
+    async with pending:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, render_derivatives, src_path, out_dir, stem)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool, _ = _get_pool()
+            return await loop.run_in_executor(pool, render_derivatives, src_path, out_dir, stem)
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,200 @@
+# Bearer JWT auth for admin routes: decoded claims cached per token until exp,
+# revocation checked through a Bloom filter backed by an exact set
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import Depends, Header, HTTPException
+from jose import ExpiredSignatureError, JWTError, jwt
+from utils.role_check_util import check_role
+load_dotenv()
+
+# No default: a known signing key would let anyone mint a super_admin token
+SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+
+if not SECRET_KEY:
+    raise ValueError("JWT_SECRET_KEY environment variable is not set.")
+ALGORITHM = "HS256"
+# Static x-admin-token values (ROLE_TOKENS) are off unless explicitly re-enabled
+# for clients that cannot send a bearer token yet
+ALLOW_LEGACY_ADMIN_TOKENS = os.getenv("ALLOW_LEGACY_ADMIN_TOKENS", "false").lower() == "true"
+# Roles that may only write to their own branch
+BRANCH_SCOPED_ROLES = ("branch_admin", "post_admin")
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class ClaimCache:
+    """LRU of token hash -> decoded claims; entries are dropped once the token expires"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        claims = self._entries.get(key)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims.get("exp", 0) <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, key, claims):
+        self._entries[key] = claims
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def stats(self):
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+class RevocationList:
+    """
+    Revoked token hashes until their exp. The Bloom filter answers the common
+    "not revoked" case from a few bit lookups; only possible hits consult the
+    exact set, so false positives never reject a valid token.
+    """
+
+    def __init__(self, bits=1 << 20, hashes=4):
+        self.bits = bits
+        self.hashes = hashes
+        self._filter = bytearray(bits // 8)
+        self._revoked = {}  # token hash -> exp
+        self.bloom_negatives = 0
+        self.exact_checks = 0
+
+    def _positions(self, key):
+        digest = bytes.fromhex(key)
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[i * 4:(i + 1) * 4], "big") % self.bits
+
+    def _add_to_filter(self, key):
+        for position in self._positions(key):
+            self._filter[position // 8] |= 1 << (position % 8)
+
+    def revoke(self, key, exp):
+        self._prune()
+        self._revoked[key] = exp
+        self._add_to_filter(key)
+
+    def is_revoked(self, key):
+        if not all(self._filter[position // 8] & (1 << (position % 8)) for position in self._positions(key)):
+            self.bloom_negatives += 1
+            return False
+        self.exact_checks += 1
+        return key in self._revoked
+
+    def _prune(self):
+        # Expired tokens fail verification anyway; rebuild the filter without them
+        now = time.time()
+        expired = [key for key, exp in self._revoked.items() if exp <= now]
+        if not expired:
+            return
+        for key in expired:
+            del self._revoked[key]
+        self._filter = bytearray(self.bits // 8)
+        for key in self._revoked:
+            self._add_to_filter(key)
+
+    def stats(self):
+        return {
+            "revoked": len(self._revoked),
+            "filter_bits": self.bits,
+            "bloom_negatives": self.bloom_negatives,
+            "exact_checks": self.exact_checks
+        }
+
+claim_cache = ClaimCache(max_entries=int(os.getenv("JWT_CLAIM_CACHE_MAX_ENTRIES", "10000")))
+revocation_list = RevocationList()
+
+def create_access_token(claims: dict) -> str:
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def verify_token(token: str) -> dict:
+    """Decoded claims for a bearer token; signature is only checked the first time a token is seen"""
+    key = token_hash(token)
+    if revocation_list.is_revoked(key):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    claims = claim_cache.get(key)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    claim_cache.put(key, claims)
+    return claims
+
+def revoke_token(token: str):
+    claims = verify_token(token)
+    key = token_hash(token)
+    revocation_list.revoke(key, claims.get("exp", time.time()))
+    claim_cache.discard(key)
+    return claims
+
+def bearer_token(authorization: Optional[str]):
+    if authorization and authorization[:7].lower() == "bearer ":
+        return authorization[7:].strip()
+    return None
+
+class AdminContext:
+    """Who is calling: role, display name for audit logs, branch from the token (if any)"""
+
+    def __init__(self, role, name, branch_id=None, via_token=False):
+        self.role = role
+        self.name = name
+        self.branch_id = branch_id
+        self.via_token = via_token
+
+async def get_current_admin(
+    authorization: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+    x_admin_name: Optional[str] = Header(default=None)
+) -> AdminContext:
+    token = bearer_token(authorization)
+    if token:
+        claims = verify_token(token)
+        return AdminContext(claims.get("role", "unauthorized"), claims.get("sub") or "unknown", claims.get("branch_id"), via_token=True)
+    if x_admin_token and ALLOW_LEGACY_ADMIN_TOKENS:
+        return AdminContext(check_role(x_admin_token), x_admin_name or "unknown")
+    raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+def require_roles(*roles):
+    """Dependency allowing only the given roles (any authenticated role when none are given)"""
+    async def dependency(admin: AdminContext = Depends(get_current_admin)) -> AdminContext:
+        if admin.role == "unauthorized" or (roles and admin.role not in roles):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        return admin
+    return dependency
+
+def admin_branch(admin: AdminContext, requested=None, convert=str):
+    """
+    Branch an admin write goes to. Bearer callers get it from the token's branch_id
+    claim (x-admin-branch is ignored); only unscoped roles without a claim may pick one.
+    Legacy x-admin-token callers still send the header.
+    """
+    if admin.via_token:
+        if admin.branch_id is not None:
+            requested = admin.branch_id
+        elif admin.role in BRANCH_SCOPED_ROLES:
+            raise HTTPException(status_code=403, detail="Token is not scoped to a branch")
+    if requested is None:
+        return None
+    try:
+        return convert(requested)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid branch id")
@@ -1,14 +1,123 @@
-from sqlalchemy.orm import Session
+# Admin audit log: entries are queued in memory and written in batches by a background task
+import asyncio
+import logging
+import os
+from datetime import datetime
+from sqlalchemy import insert
+from database import AsyncSessionLocal
 from models.db_logs import AdminActionLog
 
-def log_admin_action(db: Session, admin_name: str, role: str, action: str, item_type: str, item_id: int, notes: str = None):
-    log_entry = AdminActionLog(
-        admin_name=admin_name,
-        role=role,
-        action=action,
-        item_type=item_type,
-        item_id=item_id,
-        notes=notes
-    )
-    db.add(log_entry)
-    db.commit()
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class AuditLogQueue:
+    """
+    Bounded queue flushed with one multi-row INSERT per batch, whenever
+    batch_size entries are waiting or flush_interval seconds have passed.
+    A full queue makes producers wait (backpressure) instead of growing memory.
+    """
+
+    def __init__(self, max_size=10000, batch_size=200, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = asyncio.Queue(maxsize=max_size)
+        self._task = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Drain everything queued so far, then stop the worker
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def put(self, entry):
+        if self._task is None:
+            # No worker (scripts, startup hook not run): write straight through
+            await self._write([entry])
+            return
+        await self._queue.put(entry)
+        self.enqueued += 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._write(batch)
+
+    async def _write(self, batch):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AdminActionLog), batch)
+                await db.commit()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Never lose the trail silently: dump the batch to the application log
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} audit log entries: {str(e)}")
+            for entry in batch:
+                logger.error(f"Unwritten audit entry: {entry}")
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed
+        }
+
+audit_log_queue = AuditLogQueue(
+    max_size=int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("AUDIT_LOG_BATCH_SIZE", "200")),
+    flush_interval=float(os.getenv("AUDIT_LOG_FLUSH_SECONDS", "1.0"))
+)
+
+def _entry(admin_name, role, action, item_type, item_id, notes=None):
+    return {
+        "admin_name": admin_name,
+        "role": role,
+        "action": action,
+        "item_type": item_type,
+        "item_id": item_id,
+        "notes": notes,
+        "timestamp": datetime.utcnow()
+    }
+
+async def log_admin_action(admin_name: str, role: str, action: str, item_type: str, item_id: int, notes: str = None):
+    await audit_log_queue.put(_entry(admin_name, role, action, item_type, item_id, notes))
+
+async def log_admin_actions(admin_name: str, role: str, action: str, item_type: str, item_ids, notes: str = None):
+    """One audit entry per id for bulk operations; the queue writes them in batches"""
+    for item_id in item_ids:
+        await audit_log_queue.put(_entry(admin_name, role, action, item_type, item_id, notes))
@@ -0,0 +1,28 @@
+# Per-branch cache for the marketing items feed
+import os
+from uuid import UUID
+from utils.ttl_cache_util import TTLCache
+
+marketing_feed_cache = TTLCache(
+    "marketing_feed",
+    max_entries=int(os.getenv("MARKETING_CACHE_MAX_ENTRIES", "256")),
+    ttl=int(os.getenv("MARKETING_CACHE_TTL_SECONDS", "60")),
+    stale_ttl=int(os.getenv("MARKETING_CACHE_STALE_SECONDS", "300"))
+)
+
+def branch_cache_key(branch_id):
+    """Canonical key for a branch id given as int, UUID or header string"""
+    if branch_id is None:
+        return None
+    value = str(branch_id).strip()
+    if value.isdigit():
+        return str(int(value))
+    try:
+        return str(UUID(value))
+    except ValueError:
+        return value
+
+def invalidate_branch_feed(*branch_ids):
+    """Call after committing a service/brochure write; pass old and new branch on moves"""
+    for branch_id in set(branch_ids):
+        marketing_feed_cache.invalidate(branch_cache_key(branch_id))
@@ -0,0 +1,116 @@
+# Keeps the marketing_items read model in step with services and brochures
+from datetime import date, datetime
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from models.db_marketing_item import MarketingItem
+from models.db_service import ServiceDB
+from models.db_brochure import Brochure
+from utils.marketing_cache_util import branch_cache_key
+from utils.utils_cta_status import generate_whatsapp_cta_link_ar, generate_cta_link_service, calculate_service_status
+
+UPSERT_COLUMNS = (
+    "branch_key", "title", "category", "cta", "base_status",
+    "start_date", "end_date", "infinite", "sort_date", "updated_at"
+)
+
+SYNC_BATCH_SIZE = 1000
+
+def _sort_date(start_date, created_at):
+    if start_date:
+        return start_date
+    if created_at:
+        return created_at.date()
+    return date.today()
+
+def service_item_values(svc):
+    return {
+        "item_type": "service",
+        "source_id": svc.id,
+        "branch_key": branch_cache_key(svc.branch_id),
+        "title": svc.name or "",
+        "category": None,
+        "cta": generate_cta_link_service(svc),
+        "base_status": calculate_service_status(svc),
+        "start_date": None,
+        "end_date": None,
+        "infinite": False,
+        "sort_date": _sort_date(None, svc.created_at),
+        "updated_at": datetime.utcnow()
+    }
+
+def brochure_item_values(bro):
+    return {
+        "item_type": "brochure",
+        "source_id": bro.id,
+        "branch_key": branch_cache_key(bro.branch_id),
+        "title": bro.title or "",
+        "category": bro.category,
+        "cta": bro.cta_link or generate_whatsapp_cta_link_ar(bro.cta_phone, bro.title, bro.code, "brochure"),
+        "base_status": bro.status,
+        "start_date": bro.start_date,
+        "end_date": bro.expiry_date,
+        "infinite": bool(bro.infinite),
+        "sort_date": _sort_date(bro.start_date, bro.created_at),
+        "updated_at": datetime.utcnow()
+    }
+
+def _is_visible(item_type, source):
+    # Same visibility the live feed used: active services, non-deleted brochures
+    if item_type == "service":
+        return bool(source.is_active)
+    return not source.is_deleted
+
+def _upsert_statement(rows):
+    stmt = insert(MarketingItem).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint="uq_marketing_items_source",
+        set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS}
+    )
+
+async def sync_marketing_item(db, item_type, source):
+    """
+    Upsert (or drop, when no longer visible) the read-model row for one source row.
+    Runs in the caller's transaction; flush first so source.id is set.
+    """
+    await sync_marketing_items(db, item_type, [source])
+
+async def sync_marketing_items(db, item_type, sources):
+    """Bulk form of sync_marketing_item: one upsert for visible rows, one delete for the rest"""
+    to_values = service_item_values if item_type == "service" else brochure_item_values
+    visible = [to_values(source) for source in sources if _is_visible(item_type, source)]
+    hidden = [source.id for source in sources if not _is_visible(item_type, source)]
+    # Chunked to stay under the bind-parameter limit of a single statement
+    for start in range(0, len(visible), SYNC_BATCH_SIZE):
+        await db.execute(_upsert_statement(visible[start:start + SYNC_BATCH_SIZE]))
+    if hidden:
+        await db.execute(delete(MarketingItem).where(
+            MarketingItem.item_type == item_type,
+            MarketingItem.source_id.in_(hidden)
+        ))
+
+async def remove_marketing_item(db, item_type, source_id):
+    await db.execute(delete(MarketingItem).where(
+        MarketingItem.item_type == item_type,
+        MarketingItem.source_id == source_id
+    ))
+
+def rebuild_marketing_items(db, batch_size=500):
+    """Full refresh from the source tables (sync session); used for backfill and repair"""
+    db.execute(delete(MarketingItem))
+    total = 0
+    sources = [
+        ("service", select(ServiceDB).where(ServiceDB.is_active == True), service_item_values),
+        ("brochure", select(Brochure).where(Brochure.is_deleted.isnot(True)), brochure_item_values),
+    ]
+    for _, stmt, to_values in sources:
+        batch = []
+        for row in db.execute(stmt.execution_options(yield_per=batch_size)).scalars():
+            batch.append(to_values(row))
+            if len(batch) >= batch_size:
+                db.execute(_upsert_statement(batch))
+                total += len(batch)
+                batch = []
+        if batch:
+            db.execute(_upsert_statement(batch))
+            total += len(batch)
+    return total
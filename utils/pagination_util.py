@@ -1,4 +1,9 @@
 # Pagination logic utility
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, func, literal_column, or_, select, tuple_
+
 def apply_pagination(data_list, page=1, limit=20):
     start = (page - 1) * limit
     end = start + limit
@@ -8,4 +13,113 @@ def apply_pagination(data_list, page=1, limit=20):
         "limit": limit,
         "total_items": len(data_list),
         "items": paginated_data
-    }
\ No newline at end of file
+    }
+
+def title_sort_key(column):
+    """
+    coalesce(column, '') COLLATE "C": byte order, which is how Python compares the
+    merged titles. '' is a literal (not bound) so the expression matches its index.
+    """
+    return func.coalesce(column, literal_column("''")).collate("C")
+
+def dump_cursor_value(value):
+    """JSON-safe form of a sort value; dates keep their type"""
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    return value
+
+def load_cursor_value(value):
+    if isinstance(value, dict):
+        if value.get("t") == "datetime":
+            return datetime.fromisoformat(value["v"])
+        if value.get("t") == "date":
+            return date.fromisoformat(value["v"])
+    return value
+
+def encode_token(payload):
+    """Opaque URL-safe token for any JSON payload"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_token(token):
+    """Inverse of encode_token; raises ValueError on malformed input"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+def encode_cursor(sort_value, row_id, sort=None):
+    """Opaque cursor holding the sort key and id of the last row on a page (and which sort it is for)"""
+    return encode_token({"s": sort, "k": dump_cursor_value(sort_value), "id": row_id})
+
+def decode_cursor(cursor, sort=None):
+    """Inverse of encode_cursor; raises ValueError on malformed input or a cursor for another sort"""
+    payload = decode_token(cursor)
+    try:
+        if payload.get("s") != sort:
+            raise ValueError(f"Cursor was issued for order_by={payload.get('s')}")
+        return load_cursor_value(payload["k"]), int(payload["id"])
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_order(sort_column, id_column):
+    # NULLS LAST is Postgres' default for ASC, so plain (column, id) indexes still serve it
+    return sort_column.asc().nulls_last(), id_column
+
+def keyset_after(sort_column, id_column, last_value, last_id):
+    """
+    Rows after (last_value, last_id) in keyset_order. A plain row comparison is NULL
+    for NULL sort values, which would skip those rows or end the listing on one.
+    """
+    if last_value is None:
+        return and_(sort_column.is_(None), id_column > last_id)
+    return or_(tuple_(sort_column, id_column) > tuple_(last_value, last_id), sort_column.is_(None))
+
+async def paginate_query(db, stmt, sort_column, id_column, page=1, limit=20, cursor=None, count_total=True, as_rows=False):
+    """
+    Push pagination down to SQL.
+    With a cursor only the rows after it are read (keyset, constant cost per page);
+    without one the classic page/limit offset is used and total_items is counted
+    (skip the count with count_total=False).
+    Items are returned as ORM rows so callers can serialize them as they need;
+    with as_rows=True a column-projected stmt comes back as plain row tuples
+    (it must select sort_column and id_column).
+    """
+    if page < 1 or limit < 1:
+        raise ValueError("page and limit must be at least 1")
+    total = None
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort_column.key)
+        if sort_column is id_column:
+            stmt = stmt.where(id_column > last_id)
+        else:
+            stmt = stmt.where(keyset_after(sort_column, id_column, last_value, last_id))
+    else:
+        if count_total:
+            count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+            total = (await db.execute(count_stmt)).scalar_one()
+        stmt = stmt.offset((page - 1) * limit)
+
+    if sort_column is id_column:
+        stmt = stmt.order_by(id_column)
+    else:
+        stmt = stmt.order_by(*keyset_order(sort_column, id_column))
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all() if as_rows else result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key), sort_column.key)
+
+    return {
+        "page": page,
+        "limit": limit,
+        "total_items": total,
+        "items": rows,
+        "next_cursor": next_cursor
+    }
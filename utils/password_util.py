@@ -0,0 +1,91 @@
+# bcrypt verification off the event loop: bounded thread pool, concurrency cap and queue metrics
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from fastapi import HTTPException
+
+class PasswordVerifier:
+    """
+    Runs bcrypt.checkpw (which releases the GIL) in its own small thread pool so a
+    burst of logins never blocks the event loop or the default threadpool.
+    At most max_concurrent checks run at once; up to max_waiting more wait their
+    turn and anything beyond that is refused with 503 instead of piling up.
+    """
+
+    def __init__(self, max_concurrent=2, max_waiting=32):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._executor = None
+        self._slots = None
+        self._dummy_hash = None
+        self.waiting = 0
+        self.running = 0
+        self.verified = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_verify_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="bcrypt")
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+
+    async def verify(self, password: str, hashed) -> bool:
+        self._ensure_started()
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Too many logins in progress, retry shortly", headers={"Retry-After": "1"})
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        self.total_wait_seconds += started - queued_at
+        self.max_wait_seconds = max(self.max_wait_seconds, started - queued_at)
+        self.running += 1
+        try:
+            hashed = hashed.encode() if isinstance(hashed, str) else hashed
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, bcrypt.checkpw, password.encode(), hashed)
+        finally:
+            self.running -= 1
+            self._slots.release()
+            self.verified += 1
+            self.total_verify_seconds += time.perf_counter() - started
+
+    async def verify_unknown_account(self, password: str) -> bool:
+        """Spend the same bcrypt time for unknown emails so response timing does not reveal accounts"""
+        self._ensure_started()
+        if self._dummy_hash is None:
+            loop = asyncio.get_running_loop()
+            self._dummy_hash = await loop.run_in_executor(self._executor, bcrypt.hashpw, b"giyo-dummy", bcrypt.gensalt(rounds=12))
+        await self.verify(password, self._dummy_hash)
+        return False
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "running": self.running,
+            "waiting": self.waiting,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.verified * 1000, 2) if self.verified else None,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            "avg_verify_ms": round(self.total_verify_seconds / self.verified * 1000, 2) if self.verified else None
+        }
+
+password_verifier = PasswordVerifier(
+    max_concurrent=int(os.getenv("LOGIN_VERIFY_CONCURRENCY", "2")),
+    max_waiting=int(os.getenv("LOGIN_VERIFY_MAX_WAITING", "32"))
+)
@@ -0,0 +1,59 @@
+# In-process token buckets (per worker) for throttling by IP, account or any other key
+import os
+import time
+from collections import OrderedDict
+
+class TokenBucketLimiter:
+    """
+    Each key gets a bucket of `burst` tokens refilled at rate_per_minute.
+    Buckets live in an LRU of max_keys entries, so memory stays bounded
+    even when the keys are attacker-controlled.
+    """
+
+    def __init__(self, name, rate_per_minute, burst, max_keys=10000):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key):
+        """Spend one token; returns 0 when allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            self.allowed += 1
+            return 0
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        self.limited += 1
+        return (1 - tokens) / self.rate if self.rate else 60
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "rate_per_minute": round(self.rate * 60, 2),
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited
+        }
+
+login_ip_limiter = TokenBucketLimiter(
+    "login_ip",
+    rate_per_minute=float(os.getenv("LOGIN_IP_RATE_PER_MINUTE", "20")),
+    burst=int(os.getenv("LOGIN_IP_BURST", "10"))
+)
+
+login_account_limiter = TokenBucketLimiter(
+    "login_account",
+    rate_per_minute=float(os.getenv("LOGIN_ACCOUNT_RATE_PER_MINUTE", "5")),
+    burst=int(os.getenv("LOGIN_ACCOUNT_BURST", "5"))
+)
@@ -0,0 +1,25 @@
+# Read-your-writes window: right after a write invalidates a cache, rebuilds read from
+# the primary so a lagging replica cannot put pre-write rows back in for a full TTL
+import os
+import time
+
+# Replica lag is only sampled every DB_REPLICA_CHECK_INTERVAL, so allow lag limit + interval
+READ_YOUR_WRITES_SECONDS = float(os.getenv(
+    "READ_YOUR_WRITES_SECONDS",
+    float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5")) + float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+))
+
+_primary_until = 0.0
+primary_reads = 0
+
+def note_write():
+    """Call when a write invalidates cached reads"""
+    global _primary_until
+    _primary_until = time.monotonic() + READ_YOUR_WRITES_SECONDS
+
+def prefer_primary() -> bool:
+    global primary_reads
+    if time.monotonic() < _primary_until:
+        primary_reads += 1
+        return True
+    return False
@@ -0,0 +1,113 @@
+# In-process response cache with strong ETags for public list endpoints
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from decimal import Decimal
+import orjson
+from fastapi.encoders import jsonable_encoder
+from utils.read_after_write_util import note_write
+
+CACHE_CONTROL = "no-cache"  # browsers/CDN may store, but must revalidate with If-None-Match
+
+class ResponseCache:
+    """
+    LRU of serialized responses keyed by namespace + path + query params + x-admin-branch.
+    Writes bump the namespace generation, which drops its entries and stops
+    builds that started before the write from storing stale bodies.
+    Entries also expire after ttl seconds since date-driven fields (brochure status)
+    change without a write, and each worker process holds its own copy.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: Request, namespace: str):
+        params = tuple(sorted(request.query_params.multi_items()))
+        return (namespace, request.url.path, params, request.headers.get("x-admin-branch"))
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[2] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key, etag, body, generation):
+        if generation != self.generation(key[0]):
+            return
+        self._entries[key] = (etag, body, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        self._generations[namespace] = self.generation(namespace) + 1
+        # The next miss rebuilds from the primary, not a replica that may not have the write yet
+        note_write()
+        for key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[key]
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+    ttl=int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+)
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+def _orjson_default(value):
+    # orjson handles dict/list/str/number/date/datetime/UUID natively; the rest goes through FastAPI's encoder
+    if isinstance(value, Decimal):
+        return float(value)
+    return jsonable_encoder(value)
+
+def serialize(data):
+    return orjson.dumps(data, default=_orjson_default)
+
+async def cached_json_response(request: Request, namespace: str, build):
+    """
+    Serve from cache when possible, answering If-None-Match with 304.
+    build is an async callable returning the payload; it only runs on a miss.
+    """
+    key = response_cache.make_key(request, namespace)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation(namespace)
+        body = serialize(await build())
+        etag = f'"{hashlib.sha256(body).hexdigest()}"'
+        response_cache.set(key, etag, body, generation)
+    else:
+        etag, body, _ = entry
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
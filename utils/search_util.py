@@ -0,0 +1,52 @@
+# Full-text search helpers: one Arabic/English normalization shared by the generated
+# tsvector columns (SQL) and by incoming queries (Python), so both sides match
+import re
+from sqlalchemy import func, literal_column
+
+# Tashkeel (fathatan..sukun and extended marks), superscript alef, tatweel
+ARABIC_DIACRITICS = "[\u064b-\u065f\u0670\u0640]"
+# أ إ آ ٱ -> ا, ى -> ي, ة -> ه
+ARABIC_FOLD_FROM = "\u0623\u0625\u0622\u0671\u0649\u0629"
+ARABIC_FOLD_TO = "\u0627\u0627\u0627\u0627\u064a\u0647"
+
+SEARCH_CONFIG = "simple"  # no stemming: works the same for Arabic and English tokens
+MAX_QUERY_TERMS = 8
+
+_diacritics = re.compile(ARABIC_DIACRITICS)
+_fold = str.maketrans(ARABIC_FOLD_FROM, ARABIC_FOLD_TO)
+_terms = re.compile(r"[^\W_]+")
+
+def normalize_search_text(text: str) -> str:
+    """Python mirror of the SQL normalization in search_vector_sql"""
+    return _diacritics.sub("", text or "").translate(_fold).lower()
+
+def _normalized_sql(column_name):
+    return (
+        f"translate(regexp_replace(coalesce({column_name}, ''), '{ARABIC_DIACRITICS}', '', 'g'), "
+        f"'{ARABIC_FOLD_FROM}', '{ARABIC_FOLD_TO}')"
+    )
+
+def search_vector_sql(*weighted_columns):
+    """
+    Expression for a STORED generated tsvector column from (column_name, weight) pairs,
+    e.g. search_vector_sql(("title", "A"), ("description", "B")). Only immutable
+    functions, as Postgres requires for generated columns.
+    """
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, {_normalized_sql(column)}), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+def search_terms(query: str):
+    return _terms.findall(normalize_search_text(query))[:MAX_QUERY_TERMS]
+
+def build_tsquery(terms):
+    """All terms must match; each one as a prefix so partial words find results while typing"""
+    return func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+
+def search_condition(vector_column, tsquery):
+    # Served by the GIN index on the vector column
+    return vector_column.bool_op("@@")(tsquery)
+
+def search_rank(vector_column, tsquery):
+    return func.ts_rank(vector_column, tsquery)
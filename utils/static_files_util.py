@@ -0,0 +1,158 @@
+# /static serving tuned for caching: immutable headers for content-hashed files, strong ETags,
+# single byte ranges, precompressed .br/.gz siblings and optional hand-off to nginx/Apache
+import os
+import re
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# <sha256>.<ext> originals and <sha256>_<variant>.<ext> derivatives never change content
+HASHED_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}(_[a-z0-9]+)?\.[a-z0-9]+$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_DEFAULT_MAX_AGE = int(os.getenv("STATIC_DEFAULT_MAX_AGE", "300"))
+
+# "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd); empty = serve from Python
+STATIC_OFFLOAD = os.getenv("STATIC_OFFLOAD", "").lower()
+STATIC_ACCEL_PREFIX = os.getenv("STATIC_ACCEL_PREFIX", "/protected-static").rstrip("/")
+
+# Brotli preferred over gzip when the client accepts both
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+CHUNK_SIZE = 64 * 1024
+
+class FileRangeResponse(Response):
+    """206 response streaming bytes start..end (inclusive) of a file"""
+
+    def __init__(self, path, start, end, headers, media_type=None):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def parse_byte_range(header: str, size: int):
+    """
+    Single "bytes=a-b" / "bytes=a-" / "bytes=-n" range -> (start, end).
+    Returns None for anything we serve in full (multi-range, malformed) and
+    raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if size == 0 or (not first and not last):
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with cache-friendly responses. Hashed files get a year-long
+    immutable Cache-Control; everything else STATIC_DEFAULT_MAX_AGE and
+    revalidation through the strong ETag.
+    """
+
+    def cache_headers(self, full_path, stat_result):
+        name = os.path.basename(full_path)
+        if HASHED_NAME_PATTERN.match(name):
+            # Content hash is the name, so it is also the best possible validator
+            etag = f'"{name.split(".")[0]}"'
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+            cache_control = f"public, max-age={STATIC_DEFAULT_MAX_AGE}"
+        return {"etag": etag, "cache-control": cache_control, "accept-ranges": "bytes"}
+
+    def offload_response(self, full_path, headers, media_type):
+        if STATIC_OFFLOAD == "x-accel-redirect":
+            relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            headers["x-accel-redirect"] = f"{STATIC_ACCEL_PREFIX}/{relative}"
+        else:
+            headers["x-sendfile"] = os.path.abspath(full_path)
+        # Front server streams the body (and handles Range); we only send headers
+        return Response(headers=headers, media_type=media_type)
+
+    def precompressed_variant(self, full_path, accept_encoding):
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding in accept_encoding:
+                try:
+                    stat_result = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                return encoding, full_path + suffix, stat_result
+        return None
+
+    @staticmethod
+    def has_precompressed_variant(full_path):
+        return any(os.path.exists(full_path + suffix) for _, suffix in PRECOMPRESSED_ENCODINGS)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        headers = self.cache_headers(full_path, stat_result)
+        media_type = guess_type(full_path)[0] or "text/plain"
+
+        if STATIC_OFFLOAD in ("x-accel-redirect", "x-sendfile"):
+            if status_code == 200 and self.is_not_modified(headers, request_headers):
+                return NotModifiedResponse(headers)
+            return self.offload_response(full_path, headers, media_type)
+
+        range_header = request_headers.get("range")
+        # Ranges are served from the identity file only
+        precompressed = None if range_header else self.precompressed_variant(full_path, request_headers.get("accept-encoding", ""))
+        if precompressed or self.has_precompressed_variant(full_path):
+            # Identity and encoded bytes share a URL: shared caches must key on Accept-Encoding either way
+            headers["vary"] = "Accept-Encoding"
+        if precompressed:
+            encoding, full_path, stat_result = precompressed
+            headers["content-encoding"] = encoding
+            # Different bytes need a different validator
+            headers["etag"] = f'{headers["etag"][:-1]}-{encoding}"'
+
+        if status_code == 200 and self.is_not_modified(headers, request_headers):
+            return NotModifiedResponse(headers)
+
+        if_range = request_headers.get("if-range")
+        if status_code == 200 and range_header and (not if_range or if_range == headers["etag"]):
+            size = stat_result.st_size
+            try:
+                byte_range = parse_byte_range(range_header, size)
+            except ValueError:
+                headers["content-range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            if byte_range:
+                start, end = byte_range
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                headers["content-length"] = str(end - start + 1)
+                return FileRangeResponse(full_path, start, end, headers, media_type=media_type)
+
+        return FileResponse(full_path, status_code=status_code, headers=headers,
+                            media_type=media_type, stat_result=stat_result)
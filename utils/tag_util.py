@@ -0,0 +1,37 @@
+# Tag normalization, array filters (served by GIN indexes) and cached per-branch tag facets
+import os
+from sqlalchemy import func, select
+from utils.ttl_cache_util import TTLCache
+
+TAG_MODES = ("any", "all")
+
+tag_facet_cache = TTLCache(
+    "tag_facets",
+    max_entries=int(os.getenv("TAG_FACET_CACHE_MAX_ENTRIES", "256")),
+    ttl=int(os.getenv("TAG_FACET_CACHE_TTL_SECONDS", "300")),
+    stale_ttl=int(os.getenv("TAG_FACET_CACHE_STALE_SECONDS", "600"))
+)
+
+def normalize_tags(tags):
+    """Lower-cased, trimmed, de-duplicated (first occurrence wins)"""
+    return list(dict.fromkeys(t.strip().lower() for t in tags or [] if t and t.strip()))
+
+def parse_tags_param(tags: str):
+    return normalize_tags(tags.split(",")) if tags else []
+
+def tag_filter(tags_column, tags, mode="any"):
+    # any: tags && ARRAY[...]; all: tags @> ARRAY[...]
+    return tags_column.contains(tags) if mode == "all" else tags_column.overlap(tags)
+
+def tag_facet_query(model, *conditions):
+    """(tag, count) for rows matching conditions, most used first"""
+    tags = select(func.unnest(model.tags).label("tag")).where(*conditions).subquery()
+    count = func.count().label("count")
+    return select(tags.c.tag, count).group_by(tags.c.tag).order_by(count.desc(), tags.c.tag)
+
+async def cached_tag_facets(namespace, branch_key, load):
+    return await tag_facet_cache.get_or_load((namespace, branch_key), load)
+
+def invalidate_tag_facets(namespace):
+    """Call after committing writes to services ("services") or brochures ("brochures")"""
+    tag_facet_cache.invalidate(namespace)
@@ -0,0 +1,138 @@
+# Bounded async TTL + LRU cache with stale-while-revalidate
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from utils.read_after_write_util import note_write
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """
+    Values are fresh for ttl seconds; for a further stale_ttl seconds the stale
+    value is returned immediately while a single background task reloads it.
+    Concurrent misses on the same key share one load. Tuple keys are grouped
+    by their first element (e.g. branch) and invalidated together; invalidation
+    bumps the group generation so loads that started earlier do not write back
+    old data; clear() bumps a cache-wide epoch for the same reason.
+    """
+
+    def __init__(self, name, max_entries=256, ttl=60, stale_ttl=300):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._inflight = {}
+        self._refresh_tasks = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.load_errors = 0
+
+    @staticmethod
+    def _group(key):
+        return key[0] if isinstance(key, tuple) else key
+
+    def _generation(self, key):
+        return self._epoch, self._generations.get(self._group(key), 0)
+
+    def _store(self, key, value, generation):
+        if generation != self._generation(key):
+            return
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load(self, key, loader):
+        # One load per key at a time; later callers await the same future
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        generation = self._generation(key)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            self.load_errors += 1
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        except BaseException:
+            # Loader cancelled (client went away); release anyone waiting on it
+            future.cancel()
+            raise
+        else:
+            self._store(key, value, generation)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(self, key, loader):
+        try:
+            await self._load(key, loader)
+        except Exception as e:
+            logger.warning(f"Background refresh of {self.name}[{key}] failed: {str(e)}")
+
+    async def get_or_load(self, key, loader):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._refresh(key, loader))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return await self._load(key, loader)
+
+    def invalidate(self, group):
+        """Drop every entry whose key is group or starts with it"""
+        self._generations[group] = self._generations.get(group, 0) + 1
+        # Reloads right after a write read the primary, not a lagging replica
+        note_write()
+        for key in [k for k in self._entries if self._group(k) == group]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self):
+        # Epoch, not per-group generations: loads for groups with no entry yet are stopped too
+        self._epoch += 1
+        note_write()
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "load_errors": self.load_errors
+        }
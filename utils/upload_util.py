@@ -0,0 +1,185 @@
+# Image uploads: fixed-size chunks, thread-offloaded disk writes, size and type checks,
+# stored content-addressed (sha256, sharded directories) so identical images are kept once
+import glob
+import hashlib
+import os
+import time
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_BYTES = int(float(os.getenv("MAX_IMAGE_UPLOAD_MB", "10")) * 1024 * 1024)
+# Files younger than this are never pruned: their row may still be committing
+IMAGE_PRUNE_GRACE_SECONDS = int(float(os.getenv("IMAGE_PRUNE_GRACE_HOURS", "24")) * 3600)
+
+# Magic bytes -> stored extension
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+)
+
+def detect_image_extension(head: bytes):
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def shard_path(digest: str, ext: str):
+    """sha256 hex -> "ab/cd/<digest><ext>" so no directory grows past 65k entries"""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+def _commit_upload(temp_path, directory, relative_path):
+    final_path = os.path.join(directory, relative_path)
+    if os.path.exists(final_path):
+        # Same bytes already stored: keep the existing file, restarting its prune grace period
+        _remove_quietly(temp_path)
+        try:
+            os.utime(final_path)
+        except OSError:
+            pass
+        return
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+
+async def save_image_upload(upload: UploadFile, directory: str, max_bytes: int = MAX_IMAGE_BYTES):
+    """
+    Copy an uploaded image into the content-addressed store under directory and
+    return (relative_path, size, sha256 hex). The hash is computed while copying;
+    identical uploads resolve to the same path and are stored once.
+    The type comes from the first chunk's magic bytes, not the client's filename;
+    files over max_bytes are rejected and the partial file is removed. Memory use
+    is one chunk per upload. Starlette has already spooled the whole body by now,
+    so the request size itself is capped by MaxUploadSizeMiddleware.
+    """
+    chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+    ext = detect_image_extension(chunk)
+    if ext is None:
+        raise HTTPException(status_code=400, detail="Only JPG/PNG images allowed")
+
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".upload-{uuid4().hex}")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Image exceeds {max_bytes // (1024 * 1024)} MB limit")
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, temp_path)
+        raise
+    await run_in_threadpool(buffer.close)
+
+    image_hash = digest.hexdigest()
+    relative_path = shard_path(image_hash, ext)
+    await run_in_threadpool(_commit_upload, temp_path, directory, relative_path)
+    return relative_path, size, image_hash
+
+def prune_unreferenced_images(directory: str, referenced_hashes, grace_seconds: int = IMAGE_PRUNE_GRACE_SECONDS) -> int:
+    """
+    Remove stored originals/derivatives whose hash no row references; returns files removed.
+    Failed creates leave their upload behind on purpose (another request may be committing
+    a row for the same hash), so only files older than grace_seconds are considered.
+    """
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for path in glob.glob(os.path.join(directory, "??", "??", "*")):
+        image_hash = os.path.basename(path).split(".")[0].split("_")[0]
+        if image_hash in referenced_hashes:
+            continue
+        try:
+            if os.path.getmtime(path) > cutoff:
+                continue
+        except OSError:
+            continue
+        _remove_quietly(path)
+        removed += 1
+    return removed
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+_TOO_LARGE_BODY = b'{"detail":"Request body too large"}'
+
+class MaxUploadSizeMiddleware:
+    """
+    Rejects requests under the given path prefixes whose body is over the limit:
+    a declared Content-Length is checked before anything is read, and chunked or
+    unlabelled bodies are counted as they arrive and cut off once past the limit.
+    Paths under exclude_prefixes are left to a middleware with their own limit.
+    """
+
+    def __init__(self, app, path_prefixes, max_bytes, exclude_prefixes=()):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        self.max_bytes = max_bytes
+
+    async def _reject(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(_TOO_LARGE_BODY)).encode())]
+        })
+        await send({"type": "http.response.body", "body": _TOO_LARGE_BODY})
+
+    async def __call__(self, scope, receive, send):
+        if not (
+            scope["type"] == "http"
+            and scope["method"] in ("POST", "PUT")
+            and scope["path"].startswith(self.path_prefixes)
+            and not scope["path"].startswith(self.exclude_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                # The app turned the cut-off body into its own error (e.g. a 400 from
+                # form parsing); answer 413 instead and drop what it sends
+                if not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RequestBodyTooLarge:
+            if not response_started:
+                await self._reject(send)